@@ -0,0 +1,313 @@
+"""
+Évaluation vectorisée (NumPy) de la stratégie miroir sur de grands historiques.
+
+L'historique est chargé une seule fois dans des tableaux compacts :
+- un masque de costumes (4 bits) par jeu pour le premier groupe
+- une matrice des compteurs de statistiques (une ligne par message du canal 2)
+
+La numérotation des jeux de la source recommence chaque jour : l'historique
+est découpé en époques (même règle que engine.RESTART_GAP) et un jeu est
+repéré par (époque, numéro). Une prédiction n'est jamais résolue avec un
+résultat d'une autre époque.
+
+Les signaux, les jeux cibles et les rattrapages (0 à 3) sont ensuite calculés
+par opérations sur tableaux. validate() rejoue un échantillon de lignes dans
+PredictionEngine (VirtualClock, état neuf par ligne) et compare les résultats.
+
+NumPy n'est requis que pour ce module (pip install numpy).
+"""
+import re
+import random
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from suits import SUIT_COUNT, NO_SUIT, mask_has
+from strategy import StrategyConfig, DEFAULT_STRATEGY, DEFAULT_USER_A
+from engine import (
+    MAX_RATTRAPAGE, RESTART_GAP, PredictionEngine, SendPrediction, EditPrediction, ResultEvent,
+    parse_source_message, find_mirror_signal
+)
+from clock import VirtualClock
+
+try:
+    import numpy as np
+except ImportError:  # Dépendance optionnelle
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Codes de résultat : 0..3 = ✅ au rattrapage k
+OUTCOME_MISS = MAX_RATTRAPAGE + 1  # ❌ après tous les rattrapages
+OUTCOME_UNRESOLVED = -1            # Résultat d'un jeu nécessaire absent de l'historique
+OUTCOME_NO_SIGNAL = -2             # Pas de prédiction pour ce message de stats
+
+# Statut final d'une prédiction dans le texte édité par le moteur
+_STATUS_PATTERN = re.compile(r"Résultats : (?:✅(\d)️⃣|(❌))")
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("NumPy est requis pour l'évaluation vectorisée (pip install numpy)")
+
+@dataclass
+class History:
+    """Historique compact des résultats et des statistiques."""
+    game_masks: "np.ndarray"    # uint8, indexé par epoch_start[époque] + numéro de jeu
+    game_seen: "np.ndarray"     # bool, True si le résultat du jeu est connu
+    epoch_start: "np.ndarray"   # int64, début de chaque époque dans game_masks
+    epoch_size: "np.ndarray"    # int64, plus grand numéro de jeu de l'époque + 1
+    stats_epoch: "np.ndarray"   # int64, époque lors du message de stats
+    stats_base: "np.ndarray"    # int64, dernier numéro source 1 lors du message de stats
+    stats_counts: "np.ndarray"  # int32 (n, 4), -1 si le costume est absent
+
+@dataclass
+class Evaluation:
+    """Résultat de l'évaluation, une ligne par message de stats."""
+    signal: "np.ndarray"   # bool
+    suit: "np.ndarray"     # int8, costume (NO_SUIT si pas de signal)
+    target: "np.ndarray"   # int64, jeu cible
+    outcome: "np.ndarray"  # int8, voir les codes OUTCOME_*
+
+    def summary(self) -> dict:
+        """Nombre de prédictions par résultat."""
+        labels = {k: f'✅{k}' for k in range(MAX_RATTRAPAGE + 1)}
+        labels[OUTCOME_MISS] = '❌'
+        labels[OUTCOME_UNRESOLVED] = '⏳'
+        resolved = self.outcome[self.signal]
+        return {label: int((resolved == code).sum()) for code, label in labels.items()}
+
+def _walk_records(records):
+    """
+    Parcourt un flux (is_stats_channel, texte) comme le moteur.
+
+    Une nouvelle époque commence quand le numéro de jeu recule de plus de
+    RESTART_GAP (numérotation redémarrée par la source).
+
+    Yields:
+        ('result', époque, numéro, ResultEvent) pour le premier résultat de chaque jeu de l'époque
+        ('stats', époque, dernier numéro source 1, StatsEvent) pour chaque message du canal 2
+    """
+    last_source_game_number = 0
+    epoch = 0
+    seen_games = set()
+    for is_stats, text in records:
+        event = parse_source_message(text, is_stats)
+        if event is None:
+            continue
+        if isinstance(event, ResultEvent):
+            if event.game_number < last_source_game_number - RESTART_GAP:
+                epoch += 1
+                seen_games.clear()
+            last_source_game_number = event.game_number
+            if event.first_mask is not None and event.game_number not in seen_games:
+                seen_games.add(event.game_number)
+                yield 'result', epoch, event.game_number, event
+        else:
+            yield 'stats', epoch, last_source_game_number, event
+
+def load_history(records) -> History:
+    """Charge un flux de messages bruts dans des tableaux compacts."""
+    _require_numpy()
+    epochs, games, masks = [], [], []
+    stats_epochs, bases, counts = [], [], []
+    for kind, epoch, number, event in _walk_records(records):
+        if kind == 'result':
+            epochs.append(epoch)
+            games.append(number)
+            masks.append(event.first_mask)
+        else:
+            stats_epochs.append(epoch)
+            bases.append(number)
+            counts.append(event.stats)
+
+    epoch_count = max(epochs + stats_epochs, default=-1) + 1
+    epoch_size = np.zeros(epoch_count, dtype=np.int64)
+    epoch_idx = np.asarray(epochs, dtype=np.int64)
+    game_idx = np.asarray(games, dtype=np.int64)
+    if games:
+        np.maximum.at(epoch_size, epoch_idx, game_idx + 1)
+    epoch_start = np.concatenate(([0], np.cumsum(epoch_size)[:-1])).astype(np.int64) if epoch_count else epoch_size
+
+    # Dernière case toujours inconnue : cible des jeux hors de leur époque
+    total = int(epoch_size.sum())
+    game_masks = np.zeros(total + 1, dtype=np.uint8)
+    game_seen = np.zeros(total + 1, dtype=bool)
+    if games:
+        flat = epoch_start[epoch_idx] + game_idx
+        game_masks[flat] = np.asarray(masks, dtype=np.uint8)
+        game_seen[flat] = True
+
+    return History(
+        game_masks=game_masks,
+        game_seen=game_seen,
+        epoch_start=epoch_start,
+        epoch_size=epoch_size,
+        stats_epoch=np.asarray(stats_epochs, dtype=np.int64),
+        stats_base=np.asarray(bases, dtype=np.int64),
+        stats_counts=np.asarray(counts, dtype=np.int32).reshape(-1, SUIT_COUNT),
+    )
+
+def evaluate(history: History, user_a: int = DEFAULT_USER_A, use_mapping: bool = False,
+             strategy: StrategyConfig = DEFAULT_STRATEGY) -> Evaluation:
+    """
+    Calcule signaux, cibles et rattrapages pour tous les messages de stats.
+
+    use_mapping applique le mapping de la stratégie au costume prédit (le moteur ne l'applique pas).
+    strategy fournit les miroirs et le seuil (permet d'évaluer une version candidate).
+    """
+    _require_numpy()
+    counts = history.stats_counts
+    n = len(counts)
+
+    signal = np.zeros(n, dtype=bool)
+    suit = np.full(n, NO_SUIT, dtype=np.int8)
+    # Le premier couple de miroirs qui atteint le seuil l'emporte
+    for s1, s2 in strategy.mirror_pairs:
+        c1, c2 = counts[:, s1], counts[:, s2]
+        hit = (c1 >= 0) & (c2 >= 0) & (np.abs(c1 - c2) >= strategy.mirror_threshold) & ~signal
+        suit[hit] = np.where(c1 < c2, s1, s2)[hit]
+        signal |= hit
+
+    signal &= history.stats_base > 0
+    suit[~signal] = NO_SUIT
+
+    if use_mapping:
+        table = np.array(strategy.suit_mapping, dtype=np.int8)
+        suit[signal] = table[suit[signal]]
+
+    target = history.stats_base + user_a
+
+    # Jeux vérifiés : cible puis rattrapages 1..MAX_RATTRAPAGE, dans l'époque du message
+    games = target[:, None] + np.arange(MAX_RATTRAPAGE + 1)
+    in_range = games < history.epoch_size[history.stats_epoch][:, None]
+    flat = np.where(in_range, history.epoch_start[history.stats_epoch][:, None] + games, len(history.game_masks) - 1)
+    seen = history.game_seen[flat]
+    bit = np.left_shift(1, np.maximum(suit, 0).astype(np.uint8))[:, None]
+    hit = seen & ((history.game_masks[flat] & bit) != 0)
+
+    # Premier jeu qui arrête la séquence : un succès ou un résultat inconnu
+    stop = hit | ~seen
+    first = stop.argmax(axis=1)
+    any_stop = stop.any(axis=1)
+    first_hit = hit[np.arange(n), first]
+    outcome = np.where(any_stop, np.where(first_hit, first, OUTCOME_UNRESOLVED), OUTCOME_MISS).astype(np.int8)
+    outcome[~signal] = OUTCOME_NO_SIGNAL
+
+    return Evaluation(signal=signal, suit=suit, target=target, outcome=outcome)
+
+def evaluate_scalar(records, user_a: int = DEFAULT_USER_A, use_mapping: bool = False, rows=None,
+                    strategy: StrategyConfig = DEFAULT_STRATEGY) -> list:
+    """
+    Évaluation de référence, jeu par jeu, avec les fonctions du moteur.
+
+    Returns:
+        liste de tuples (signal, indice costume, cible, code résultat) par message de stats
+        (seulement pour les lignes de rows si fourni)
+    """
+    results = {}
+    stats_rows = []
+    for kind, epoch, number, event in _walk_records(records):
+        if kind == 'result':
+            results[epoch, number] = event.first_mask
+        else:
+            stats_rows.append((epoch, number, event.stats))
+
+    wanted = range(len(stats_rows)) if rows is None else rows
+    out = []
+    for row in wanted:
+        epoch, base, stats = stats_rows[row]
+        found = find_mirror_signal(stats, strategy)
+        target = base + user_a
+        if found is None or base <= 0:
+            out.append((False, NO_SUIT, target, OUTCOME_NO_SIGNAL))
+            continue
+
+        predicted_suit = found[0]
+        if use_mapping:
+            predicted_suit = strategy.suit_mapping[predicted_suit]
+
+        outcome = OUTCOME_MISS
+        for rattrapage in range(MAX_RATTRAPAGE + 1):
+            mask = results.get((epoch, target + rattrapage))
+            if mask is None:
+                outcome = OUTCOME_UNRESOLVED
+                break
+            if mask_has(mask, predicted_suit):
+                outcome = rattrapage
+                break
+        out.append((True, predicted_suit, target, outcome))
+    return out
+
+def _engine_outcome(strategy: StrategyConfig, base_event, stats_event, results: dict) -> tuple:
+    """
+    Rejoue une ligne dans un PredictionEngine neuf (horloge dans la fenêtre, aucun blocage).
+
+    base_event : résultat qui fixe le dernier numéro source 1 (None si aucun)
+    results : {numéro: ResultEvent} de l'époque de la ligne
+    """
+    start = datetime(2024, 1, 1, 12, strategy.window_start_minute)
+    engine = PredictionEngine(strategy, VirtualClock(start))
+    if base_event is not None:
+        engine.process(base_event)
+    base = engine.last_source_game_number
+    effects = engine.process(stats_event)
+    sent = next((effect for effect in effects if isinstance(effect, SendPrediction)), None)
+    if sent is None:
+        return False, NO_SUIT, base + strategy.user_a, OUTCOME_NO_SIGNAL
+
+    for game in range(sent.target_game, sent.target_game + MAX_RATTRAPAGE + 1):
+        if game != base and game in results:
+            effects += engine.process(results[game])
+
+    outcome = OUTCOME_UNRESOLVED
+    for effect in effects:
+        if isinstance(effect, EditPrediction) and effect.target_game == sent.target_game and effect.final:
+            match = _STATUS_PATTERN.search(effect.text)
+            outcome = OUTCOME_MISS if match.group(2) else int(match.group(1))
+    return True, sent.suit, sent.target_game, outcome
+
+def validate(records, sample_size: int = 1000, user_a: int = DEFAULT_USER_A, seed: int = 0,
+             strategy: StrategyConfig = DEFAULT_STRATEGY) -> list:
+    """
+    Vérifie que l'évaluation vectorisée correspond exactement à PredictionEngine.
+
+    Chaque ligne échantillonnée est rejouée dans un moteur neuf à partir des
+    événements analysés (résultat de base, message de stats, puis jeu cible et
+    rattrapages de la même époque) : l'analyse, le signal miroir, la cible et
+    la chaîne de rattrapages du moteur sont ainsi comparés. Les règles de
+    blocage et la fenêtre horaire, qui dépendent de l'historique, ne sont pas
+    évaluées par le backtest. Le moteur n'applique pas suit_mapping : la
+    validation se fait sans mapping.
+
+    Returns:
+        liste des écarts (ligne, vectorisé, moteur) ; vide si tout correspond
+    """
+    records = list(records)
+    strategy = strategy.updated('validation', user_a=user_a)
+    evaluation = evaluate(load_history(records), user_a, False, strategy)
+
+    results = {}        # (époque, numéro) -> ResultEvent
+    stats_rows = []     # (époque, numéro de base, StatsEvent)
+    for kind, epoch, number, event in _walk_records(records):
+        if kind == 'result':
+            results.setdefault(epoch, {})[number] = event
+        else:
+            stats_rows.append((epoch, number, event))
+
+    n = len(stats_rows)
+    rows = sorted(random.Random(seed).sample(range(n), min(sample_size, n)))
+    mismatches = []
+    for row in rows:
+        epoch, base, stats_event = stats_rows[row]
+        epoch_results = results.get(epoch, {})
+        base_event = epoch_results.get(base) or (ResultEvent(base, f"base_{base}") if base > 0 else None)
+        expected = _engine_outcome(strategy, base_event, stats_event, epoch_results)
+        got = (bool(evaluation.signal[row]), int(evaluation.suit[row]),
+               int(evaluation.target[row]), int(evaluation.outcome[row]))
+        if got != expected:
+            mismatches.append((row, got, expected))
+
+    if mismatches:
+        logger.error(f"❌ Validation: {len(mismatches)}/{len(rows)} écarts entre vectorisé et moteur")
+    else:
+        logger.info(f"✅ Validation: {len(rows)} lignes identiques entre vectorisé et moteur")
+    return mismatches
@@ -0,0 +1,315 @@
+"""
+Benchmarks du moteur de prédiction (sans Telegram).
+
+La référence « avant » est le main.py de la première version du dépôt
+(état en variables globales, appel client.* attendu à chaque envoi ou
+édition), relu depuis git et exécuté avec FakeTelegramClient.
+
+Toutes les mesures suivent une horloge simulée (un jeu toutes les
+GAME_SECONDS secondes, uniquement dans la fenêtre H:00-H:29) : les résultats
+ne dépendent pas de l'heure de lancement et les blocages de 5 minutes et
+pauses de 30 minutes expirent comme en direct.
+
+Le mode « par lots » traite 32 événements d'un coup et fusionne leurs
+effets : la colonne appels compte les envois / éditions effectivement
+exécutés par la couche réseau.
+
+Usage: python bench.py [nombre_de_jeux]
+"""
+import os
+import sys
+import time
+import types
+import random
+import asyncio
+import logging
+import subprocess
+from datetime import datetime, timedelta
+
+# L'ancien main.py refuse de démarrer sans identifiants : valeurs factices
+for key, value in (('API_ID', '1'), ('API_HASH', 'bench'), ('BOT_TOKEN', 'bench')):
+    os.environ.setdefault(key, value)
+
+from engine import PredictionEngine, SendPrediction, parse_source_message
+from clock import VirtualClock, REAL_CLOCK
+
+# Heure de référence des mesures (fenêtre de prédiction ouverte)
+BENCH_START = datetime(2024, 1, 1, 12, 0)
+GAME_SECONDS = 20      # Écart simulé entre deux jeux
+GAMES_PER_HOUR = 90    # 90 x 20 s = 30 min, puis saut à l'heure suivante (H:30-H:59 fermé)
+BATCH_SIZE = 32
+
+SUIT_EMOJIS = ['♠️', '❤️', '♦️', '♣️']
+CARD_VALUES = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+
+def bench_times(traffic) -> list:
+    """Horodatage simulé de chaque message (deux messages par jeu)."""
+    times = []
+    for index in range(len(traffic)):
+        hour, slot = divmod(index // 2, GAMES_PER_HOUR)
+        times.append((BENCH_START + timedelta(hours=hour, seconds=slot * GAME_SECONDS)).timestamp())
+    return times
+
+def random_hand(rng: random.Random) -> str:
+    """Construit une main aléatoire de 2 ou 3 cartes."""
+    count = rng.choice((2, 3))
+    return ''.join(rng.choice(CARD_VALUES) + rng.choice(SUIT_EMOJIS) for _ in range(count))
+
+def synthetic_traffic(games: int, seed: int = 42):
+    """
+    Génère un flux réaliste de messages (is_stats_channel, texte).
+
+    Chaque jeu produit un message de statistiques puis le résultat finalisé.
+    """
+    rng = random.Random(seed)
+    counts = {'♠️': 0, '❤️': 0, '♦️': 0, '♣️': 0}
+    for game in range(1, games + 1):
+        for suit in counts:
+            counts[suit] += rng.randint(0, 2)
+        stats = '\n'.join(f"{suit} : {value} (25.0 %)" for suit, value in counts.items())
+        yield True, f"📊 Statistiques\n{stats}"
+        yield False, f"#N{game}. ✅{rng.randint(0, 9)}({random_hand(rng)}) - {rng.randint(0, 9)}({random_hand(rng)})"
+
+# --- Ancienne représentation des costumes (chaînes), référence pour les mesures ---
+
+LEGACY_SUITS = ['♠', '♥', '♦', '♣']
+
+def legacy_normalize_suits(group_str: str) -> str:
+    normalized = group_str.replace('❤️', '♥').replace('❤', '♥').replace('♥️', '♥')
+    return normalized.replace('♠️', '♠').replace('♦️', '♦').replace('♣️', '♣')
+
+def legacy_has_suit_in_group(group_str: str, target_suit: str) -> bool:
+    normalized = legacy_normalize_suits(group_str)
+    target_normalized = legacy_normalize_suits(target_suit)
+    for suit in LEGACY_SUITS:
+        if suit in target_normalized and suit in normalized:
+            return True
+    return False
+
+# --- Ancien main.py (avant PredictionEngine), référence pour les mesures ---
+
+class _BenchDatetime(datetime):
+    """datetime dont now() suit une VirtualClock (l'ancien code appelle datetime.now())."""
+
+    clock = VirtualClock(BENCH_START)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.clock.now(tz)
+
+def load_baseline_main():
+    """
+    Charge le main.py du premier commit du dépôt comme module isolé.
+
+    Returns:
+        module, ou None si git ou l'historique ne sont pas disponibles
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    try:
+        first = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.split()[0]
+        source = subprocess.run(['git', 'show', f'{first}:main.py'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, IndexError, subprocess.CalledProcessError):
+        return None
+
+    module = types.ModuleType('baseline_main')
+    try:
+        exec(compile(source, f'{first[:8]}:main.py', 'exec'), module.__dict__)
+    except (SystemExit, ImportError):
+        return None  # Identifiants manquants ou dépendance absente
+    module.datetime = _BenchDatetime
+    return module
+
+async def bench_baseline(traffic):
+    """
+    Avant : ancien main.py, chaque envoi / édition attend le client (factice, sans latence).
+
+    Les messages passent par son gestionnaire handle_message, qui envoie aussi
+    les prédictions en file après chaque message de statistiques.
+    """
+    from config import SOURCE_CHANNEL_ID, SOURCE_CHANNEL_2_ID
+    from fake_telegram import FakeTelegramClient, FakeEntity, FakeMessage, FakeEvent
+    baseline = load_baseline_main()
+    if baseline is None:
+        return None, None
+    client = FakeTelegramClient()
+    baseline.client = client
+    chats = {True: FakeEntity(SOURCE_CHANNEL_2_ID), False: FakeEntity(SOURCE_CHANNEL_ID)}
+    events = [FakeEvent(client, chats[is_stats], FakeMessage(client, chats[is_stats].id, i, text))
+              for i, (is_stats, text) in enumerate(traffic)]
+    clock = _BenchDatetime.clock = VirtualClock(BENCH_START)
+    times = bench_times(traffic)
+    start = time.process_time()
+    for event, ts in zip(events, times):
+        clock.set(ts)
+        await baseline.handle_message(event)
+    return time.process_time() - start, client.calls
+
+async def _noop_effect(effect):
+    await asyncio.sleep(0)
+
+def _count_calls(calls: dict, effects: list):
+    for effect in effects:
+        calls['send_message' if isinstance(effect, SendPrediction) else 'edit_message'] += 1
+
+async def bench_engine_per_event(traffic):
+    """Après : PredictionEngine, un événement à la fois, chaque effet attendu."""
+    clock = VirtualClock(BENCH_START)
+    engine = PredictionEngine(clock=clock)
+    times = bench_times(traffic)
+    calls = {'send_message': 0, 'edit_message': 0}
+    start = time.process_time()
+    for (is_stats, text), ts in zip(traffic, times):
+        clock.set(ts)
+        event = parse_source_message(text, is_stats)
+        if event is None:
+            continue
+        effects = engine.process(event)
+        _count_calls(calls, effects)
+        for effect in effects:
+            await _noop_effect(effect)
+    return time.process_time() - start, calls
+
+async def bench_engine_batched(traffic, batch_size: int = BATCH_SIZE):
+    """Après : PredictionEngine, lots d'événements dans une boucle serrée, effets fusionnés."""
+    clock = VirtualClock(BENCH_START)
+    engine = PredictionEngine(clock=clock)
+    times = bench_times(traffic)
+    calls = {'send_message': 0, 'edit_message': 0}
+    start = time.process_time()
+    for i in range(0, len(traffic), batch_size):
+        # Le lot est traité à l'arrivée de son dernier message
+        clock.set(times[min(i + batch_size, len(traffic)) - 1])
+        events = [parse_source_message(text, is_stats) for is_stats, text in traffic[i:i + batch_size]]
+        effects = engine.process_batch([e for e in events if e is not None])
+        _count_calls(calls, effects)
+        for effect in effects:
+            await _noop_effect(effect)
+    return time.process_time() - start, calls
+
+def run_engine_benchmark(games: int):
+    traffic = list(synthetic_traffic(games))
+    baseline, baseline_calls = asyncio.run(bench_baseline(traffic))
+    per_event, per_event_calls = asyncio.run(bench_engine_per_event(traffic))
+    batched, batched_calls = asyncio.run(bench_engine_batched(traffic))
+    n = len(traffic)
+    print(f"[engine] {n} événements")
+
+    def line(label, elapsed, calls):
+        print(f"  {label:<18} : {elapsed * 1e6 / n:8.2f} µs/événement, "
+              f"{calls['send_message']} envois + {calls['edit_message']} éditions attendus")
+
+    if baseline is None:
+        print(f"  {'ancien main.py':<18} : indisponible (historique git absent)")
+    else:
+        line("ancien main.py", baseline, baseline_calls)
+    line("moteur, un par un", per_event, per_event_calls)
+    line(f"moteur, lots de {BATCH_SIZE}", batched, batched_calls)
+
+def run_backtest_benchmark(games: int):
+    import backtest
+    if backtest.np is None:
+        print("[backtest] NumPy absent, benchmark ignoré")
+        return
+    traffic = list(synthetic_traffic(games))
+
+    start = time.perf_counter()
+    backtest.evaluate_scalar(traffic)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    history = backtest.load_history(traffic)
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    evaluation = backtest.evaluate(history)
+    vectorized = time.perf_counter() - start
+
+    mismatches = backtest.validate(traffic, sample_size=2000)
+    print(f"[backtest] {games} jeux, {int(evaluation.signal.sum())} signaux")
+    print(f"  scalaire (analyse + évaluation) : {scalar * 1e3:8.1f} ms")
+    print(f"  chargement des tableaux         : {loaded * 1e3:8.1f} ms")
+    print(f"  évaluation vectorisée           : {vectorized * 1e3:8.1f} ms")
+    print(f"  validation : {'OK' if not mismatches else f'{len(mismatches)} écarts'} {evaluation.summary()}")
+
+async def bench_ingress_flood(traffic, coalesce: bool):
+    """Rafale : tout le trafic arrive d'un coup, mesure de l'attente max avant décision."""
+    from pipeline import ChannelActor, IngressQueue
+    from delivery import Publisher
+    engine = PredictionEngine(clock=VirtualClock(BENCH_START))
+    publisher = Publisher([])  # Aucun canal de sortie : seule l'entrée est mesurée
+    results = ChannelActor('source1', False, engine, publisher, IngressQueue(maxsize=len(traffic)))
+    stats = ChannelActor('source2', True, engine, publisher,
+                         IngressQueue(maxsize=len(traffic), coalesce=coalesce), defer_to=[results])
+    # Décisions en temps virtuel, mais l'attente en file mesurée est une latence réelle
+    for actor in (results, stats):
+        actor.queue.clock = REAL_CLOCK
+    tasks = [results.start(), stats.start()]
+    start = time.perf_counter()
+    for is_stats, text in traffic:
+        (stats if is_stats else results).submit(text)
+    while results.queue.qsize() or stats.queue.qsize():
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    return elapsed, stats.queue.stats()
+
+def run_ingress_benchmark(games: int):
+    traffic = list(synthetic_traffic(games))
+    print(f"[ingress] rafale de {len(traffic)} messages")
+    for coalesce in (False, True):
+        elapsed, q = asyncio.run(bench_ingress_flood(traffic, coalesce))
+        label = "dernier gagnant" if coalesce else "FIFO complète  "
+        print(f"  stats {label}: {elapsed * 1e3:8.1f} ms, {q['coalesced']} fusionnés, "
+              f"attente max stats {q['max_wait'] * 1e3:.1f} ms")
+
+def run_suits_benchmark(games: int):
+    import tracemalloc
+    from suits import parse_suit_mask, mask_has, SUIT_COUNT
+    rng = random.Random(7)
+    groups = [random_hand(rng) for _ in range(games)]
+    checks = [(i, rng.randrange(SUIT_COUNT)) for i in range(games)]
+
+    # Même réponse pour les deux représentations
+    for i, suit in checks[:5000]:
+        assert legacy_has_suit_in_group(groups[i], LEGACY_SUITS[suit]) == mask_has(parse_suit_mask(groups[i]), suit)
+
+    # Vérification d'une prédiction : 4 tests (cible + 3 rattrapages) sur le même résultat
+    start = time.perf_counter()
+    for i, suit in checks:
+        name = LEGACY_SUITS[suit]
+        for _ in range(4):
+            legacy_has_suit_in_group(groups[i], name)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i, suit in checks:
+        mask = parse_suit_mask(groups[i])  # Analyse unique à l'arrivée du message
+        for _ in range(4):
+            mask_has(mask, suit)
+    compact = time.perf_counter() - start
+
+    # Mémoire : résultats conservés par jeu
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    kept_strings = {i: legacy_normalize_suits(g) for i, g in enumerate(groups)}
+    string_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, 'filename'))
+    snapshot = tracemalloc.take_snapshot()
+    kept_masks = bytearray(parse_suit_mask(g) for g in groups)
+    mask_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, 'filename'))
+    tracemalloc.stop()
+    del kept_strings, kept_masks
+
+    print(f"[suits] {games} résultats, 4 vérifications chacun")
+    print(f"  chaînes + normalize : {legacy * 1e9 / (games * 4):8.1f} ns/vérification")
+    print(f"  masque 4 bits       : {compact * 1e9 / (games * 4):8.1f} ns/vérification")
+    print(f"  mémoire des résultats : chaînes {string_bytes / games:.1f} o/jeu, masques {mask_bytes / games:.1f} o/jeu")
+
+if __name__ == '__main__':
+    logging.disable(logging.CRITICAL)
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    run_engine_benchmark(games)
+    run_backtest_benchmark(games)
+    run_ingress_benchmark(games)
+    run_suits_benchmark(games)
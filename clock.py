@@ -0,0 +1,130 @@
+"""
+Horloge du moteur : temps réel en production, temps virtuel en simulation.
+
+Toutes les règles temporelles (fenêtre H:00-H:29, blocages de 5 minutes,
+pauses de 30 minutes, reset quotidien) lisent l'heure via une horloge au lieu
+d'appeler datetime.now() directement. VirtualClock avance instantanément :
+une simulation de plusieurs jours de jeu s'exécute en quelques secondes avec
+exactement la même sémantique.
+
+monotonic() sert aux délais courts du pipeline (tampon de réordonnancement,
+attente dans les files d'entrée) et wait_for() borne une attente avec un
+délai exprimé dans le temps de l'horloge.
+"""
+import time
+import heapq
+import asyncio
+from itertools import count
+from datetime import datetime, timezone
+
+WAKE_YIELDS = 3  # Tours de boucle laissés aux tâches réveillées par run_until()
+
+class RealClock:
+    """Horloge système."""
+
+    def now(self, tz: timezone = None) -> datetime:
+        """Équivalent de datetime.now(tz)."""
+        return datetime.now(tz)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def wait_for(self, aw, timeout: float = None):
+        """Équivalent de asyncio.wait_for (asyncio.TimeoutError à l'expiration)."""
+        return await asyncio.wait_for(aw, timeout)
+
+class VirtualClock:
+    """
+    Horloge simulée, avancée explicitement par advance() / set().
+
+    now() suit la même convention que datetime.now() (heure locale naïve sans
+    fuseau, heure du fuseau sinon). Les tâches en attente dans sleep() sont
+    réveillées dans l'ordre de leurs échéances quand l'horloge les dépasse.
+
+    advance() / set() sont synchrones : toutes les tâches échues sont
+    réveillées d'un coup et ne s'exécutent qu'ensuite, à l'heure finale. Un
+    pas doit donc rester plus court que la période des tâches (un jour pour
+    le reset quotidien). run_for() / run_until() avancent échéance par
+    échéance et laissent chaque tâche réveillée s'exécuter à son heure,
+    quelle que soit la longueur du pas.
+    """
+
+    def __init__(self, start: datetime = None):
+        self._time = (start or datetime.now()).timestamp()
+        self._origin = self._time
+        self._sleepers = []   # tas de (échéance, ordre, future)
+        self._order = count()
+
+    def now(self, tz: timezone = None) -> datetime:
+        return datetime.fromtimestamp(self._time, tz)
+
+    def monotonic(self) -> float:
+        return self._time - self._origin
+
+    def timestamp(self) -> float:
+        return self._time
+
+    def advance(self, seconds: float):
+        """Avance l'horloge et réveille les tâches dont l'échéance est atteinte."""
+        self.set(self._time + seconds)
+
+    def set(self, when):
+        """Place l'horloge à un instant (datetime ou epoch) ; le temps ne recule jamais."""
+        target = when.timestamp() if isinstance(when, datetime) else float(when)
+        if target < self._time:
+            return
+        while self._sleepers and self._sleepers[0][0] <= target:
+            deadline, _, future = heapq.heappop(self._sleepers)
+            self._time = deadline
+            if not future.done():
+                future.set_result(None)
+        self._time = target
+
+    async def run_for(self, seconds: float):
+        """Avance de seconds en réveillant chaque tâche à sa propre échéance."""
+        await self.run_until(self._time + seconds)
+
+    async def run_until(self, when):
+        """Comme set(), mais chaque tâche réveillée s'exécute (et se réarme) avant l'échéance suivante."""
+        target = when.timestamp() if isinstance(when, datetime) else float(when)
+        while self._sleepers and self._sleepers[0][0] <= target:
+            self.set(self._sleepers[0][0])
+            # Laisser les tâches réveillées reprendre jusqu'à leur prochaine attente
+            for _ in range(WAKE_YIELDS):
+                await asyncio.sleep(0)
+        self.set(target)
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._time + seconds, next(self._order), future))
+        await future
+
+    async def wait_for(self, aw, timeout: float = None):
+        """asyncio.wait_for dont le délai s'écoule dans le temps virtuel."""
+        if timeout is None:
+            return await aw
+        task = asyncio.ensure_future(aw)
+        sleeper = asyncio.ensure_future(self.sleep(timeout))
+        try:
+            await asyncio.wait((task, sleeper), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            sleeper.cancel()
+        if task.done():
+            return task.result()
+        task.cancel()
+        await asyncio.wait((task,))
+        raise asyncio.TimeoutError()
+
+    def pending_sleepers(self) -> int:
+        return sum(1 for _, _, future in self._sleepers if not future.done())
+
+REAL_CLOCK = RealClock()
@@ -3,14 +3,28 @@ Configuration du bot Telegram de prédiction Baccarat
 """
 import os
 
-def parse_channel_id(env_var: str, default: str) -> int:
-    value = os.getenv(env_var) or default
-    channel_id = int(value)
+def normalize_channel_id(channel_id: int) -> int:
     # Convertit l'ID positif en format ID de canal Telegram négatif si nécessaire
     if channel_id > 0 and len(str(channel_id)) >= 10:
         channel_id = -channel_id
     return channel_id
 
+def parse_channel_id(env_var: str, default: str) -> int:
+    value = os.getenv(env_var) or default
+    return normalize_channel_id(int(value))
+
+def parse_channel_list(env_var: str) -> list:
+    """Liste de canaux "nom:id,nom:id" (le nom est facultatif) -> [(nom, id)]."""
+    channels = []
+    for entry in (os.getenv(env_var) or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, value = entry.rpartition(':')
+        channel_id = normalize_channel_id(int(value))
+        channels.append((name or str(channel_id), channel_id))
+    return channels
+
 # ID du canal source
 SOURCE_CHANNEL_ID = parse_channel_id('SOURCE_CHANNEL_ID', os.getenv('SOURCE_CHANNEL_ID', '-1002682552255'))
 
@@ -20,6 +34,34 @@ SOURCE_CHANNEL_2_ID = parse_channel_id('SOURCE_CHANNEL_2_ID', os.getenv('SOURCE_
 # ID du canal de prédiction
 PREDICTION_CHANNEL_ID = parse_channel_id('PREDICTION_CHANNEL_ID', os.getenv('PREDICTION_CHANNEL_ID', '-1002543915361'))
 
+# Canaux de sortie supplémentaires (VIP, public, archive...) : "vip:-100xxx,archive:-100yyy"
+EXTRA_PREDICTION_CHANNELS = parse_channel_list('EXTRA_PREDICTION_CHANNELS')
+
+# Tous les canaux qui reçoivent les prédictions
+OUTPUT_CHANNELS = ([('principal', PREDICTION_CHANNEL_ID)] if PREDICTION_CHANNEL_ID else []) + EXTRA_PREDICTION_CHANNELS
+
+# Débit maximum par canal de sortie (messages par seconde) et rafale autorisée
+OUTPUT_CHANNEL_RATE = float(os.getenv('OUTPUT_CHANNEL_RATE') or '1')
+OUTPUT_CHANNEL_BURST = int(os.getenv('OUTPUT_CHANNEL_BURST') or '3')
+
+# Pool sortant optionnel : jetons de bots supplémentaires séparés par des virgules
+POOL_BOT_TOKENS = [token.strip() for token in (os.getenv('POOL_BOT_TOKENS') or '').split(',') if token.strip()]
+# Débit maximum par bot du pool (messages par seconde, tous canaux confondus)
+POOL_CLIENT_RATE = float(os.getenv('POOL_CLIENT_RATE') or '20')
+
+# Fichier de stratégie rechargé à chaud (voir strategy.py) et intervalle de surveillance (secondes)
+STRATEGY_FILE = os.getenv('STRATEGY_FILE') or 'strategy.json'
+STRATEGY_WATCH_INTERVAL = float(os.getenv('STRATEGY_WATCH_INTERVAL') or '5')
+
+# Seuils de /health (secondes) : retard de la boucle, silence d'un canal source (avertissement), reconnexion du client
+HEALTH_LAG_THRESHOLD = float(os.getenv('HEALTH_LAG_THRESHOLD') or '5')
+HEALTH_SOURCE_STALE = float(os.getenv('HEALTH_SOURCE_STALE') or '1800')
+HEALTH_RECONNECT_AFTER = float(os.getenv('HEALTH_RECONNECT_AFTER') or '600')
+
+# Enregistrement du trafic des canaux sources (segments JSONL compressés, voir recorder.py)
+RECORD_TRAFFIC = (os.getenv('RECORD_TRAFFIC') or '1') != '0'
+TRAFFIC_DIR = os.getenv('TRAFFIC_DIR') or 'traffic'
+
 # Miroirs
 MIRROR_PAIRS = {
     '♠️': '♦️',
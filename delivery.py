@@ -0,0 +1,352 @@
+"""
+Diffusion des prédictions vers plusieurs canaux de sortie.
+
+Chaque canal (VIP, public, archive...) a son propre travailleur, sa propre
+limite de débit et sa propre correspondance jeu -> message_id pour les
+éditions. Un canal lent ou en erreur ne retarde donc jamais les autres.
+
+Les appels sortants passent par un ClientPool : le client principal et,
+optionnellement, des bots supplémentaires (un jeton chacun). Chaque envoi
+est confié au client membre du canal qui a le plus de débit disponible ;
+les éditions d'une prédiction restent sur le client qui l'a envoyée.
+
+Un FloodWait est noté pour le couple (client, canal) : il ne vide pas le
+seau partagé du client, les autres canaux continuent donc d'envoyer avec
+lui et un envoi sur le canal concerné passe par un autre client du pool.
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from engine import SendPrediction, EditPrediction
+from suits import suit_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = 1.0        # Messages par seconde et par canal
+DEFAULT_BURST = 3         # Rafale autorisée avant limitation
+CLIENT_RATE = 20.0        # Messages par seconde et par bot (tous canaux confondus)
+CLIENT_BURST = 20
+MAX_CONSECUTIVE_FAILURES = 3  # Échecs consécutifs avant de mettre un client à l'écart
+UNHEALTHY_COOLDOWN = 60.0     # Secondes d'écart avant de réessayer un client défaillant
+FLOOD_RETRIES = 1         # Nouvelles tentatives après un FloodWait
+LATENCY_SAMPLES = 200     # Nombre de mesures conservées par canal
+
+def log_send_error(chat_id: int, e: Exception):
+    """Journalise un échec d'envoi avec la cause probable."""
+    logger.error(f"❌ ÉCHEC ENVOI PRÉDICTION AU CANAL {chat_id}: {e}")
+    logger.error(f"   → Type d'erreur: {type(e).__name__}")
+
+    # Messages d'erreur spécifiques selon le type d'erreur
+    error_str = str(e).lower()
+    if 'chat' in error_str and 'not found' in error_str:
+        logger.error(f"   → CAUSE: Canal introuvable. Vérifiez l'ID: {chat_id}")
+    elif 'rights' in error_str or 'permission' in error_str or 'forbidden' in error_str:
+        logger.error(f"   → CAUSE: Droits insuffisants. Le bot doit être ADMIN du canal.")
+    elif 'private' in error_str:
+        logger.error(f"   → CAUSE: Canal privé inaccessible. Ajoutez le bot au canal.")
+
+def flood_wait_seconds(e: Exception):
+    """Durée demandée par Telegram (FloodWaitError.seconds), None sinon."""
+    seconds = getattr(e, 'seconds', None)
+    return seconds if isinstance(seconds, (int, float)) else None
+
+def is_membership_error(e: Exception) -> bool:
+    """Vrai si l'erreur indique que le bot n'a pas accès au canal."""
+    error_str = f"{type(e).__name__} {e}".lower()
+    return any(word in error_str for word in ('not found', 'forbidden', 'rights', 'permission', 'private'))
+
+class RateLimiter:
+    """Seau à jetons : rate jetons par seconde, au plus burst en réserve."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill(time.monotonic())
+        return self.tokens
+
+    async def acquire(self):
+        while True:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class PoolMember:
+    """Un client Telegram sortant du pool, avec son débit et son état."""
+
+    def __init__(self, name: str, client, rate: float = CLIENT_RATE, burst: int = CLIENT_BURST):
+        self.name = name
+        self.client = client
+        self.limiter = RateLimiter(rate, burst)
+        self.chats = {}          # chat_id -> True/False (membre ou non) ; absent = inconnu
+        self.flooded_until = {}  # chat_id -> fin du FloodWait (time.monotonic())
+        self.calls = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self.unhealthy_since = None
+
+    def is_healthy(self) -> bool:
+        is_connected = getattr(self.client, 'is_connected', None)
+        if callable(is_connected) and not is_connected():
+            return False
+        if self.unhealthy_since is None:
+            return True
+        return time.monotonic() - self.unhealthy_since >= UNHEALTHY_COOLDOWN
+
+    def can_post(self, chat_id: int) -> bool:
+        return self.chats.get(chat_id, True)
+
+    def flood_left(self, chat_id: int) -> float:
+        """Secondes de FloodWait restantes pour ce client sur ce canal."""
+        until = self.flooded_until.get(chat_id)
+        if until is None:
+            return 0.0
+        left = until - time.monotonic()
+        if left <= 0:
+            del self.flooded_until[chat_id]
+            return 0.0
+        return left
+
+    def flood(self, chat_id: int, seconds: float):
+        """Respecte un FloodWait sur ce canal uniquement."""
+        self.flooded_until[chat_id] = time.monotonic() + seconds
+
+    def record_success(self):
+        self.calls += 1
+        self.consecutive_failures = 0
+        self.unhealthy_since = None
+
+    def record_failure(self, chat_id: int, e: Exception):
+        self.total_failures += 1
+        if flood_wait_seconds(e) is not None:
+            return
+        if is_membership_error(e):
+            self.chats[chat_id] = False
+            return
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+            logger.warning(f"⚠️ Client {self.name} mis à l'écart après {self.consecutive_failures} échecs")
+            self.unhealthy_since = time.monotonic()
+
+class ClientPool:
+    """Clients sortants ; l'ingestion reste sur le client principal."""
+
+    def __init__(self):
+        self.members = []
+
+    def add(self, name: str, client, rate: float = CLIENT_RATE, burst: int = CLIENT_BURST) -> PoolMember:
+        member = PoolMember(name, client, rate, burst)
+        self.members.append(member)
+        return member
+
+    def clear(self):
+        self.members.clear()
+
+    def pick(self, chat_id: int):
+        """
+        Client membre du canal, en bonne santé, avec le plus de débit disponible.
+
+        Les clients en FloodWait sur ce canal ne sont choisis qu'à défaut
+        d'autre, celui dont l'attente finit le plus tôt en premier.
+        """
+        healthy = [m for m in self.members if m.is_healthy()]
+        # Si aucun client n'est membre, on tente quand même (la vérification a pu échouer temporairement)
+        candidates = [m for m in healthy if m.can_post(chat_id)] or healthy
+        if not candidates:
+            return None
+        return min(candidates, key=lambda m: (m.flood_left(chat_id), -m.limiter.available()))
+
+    async def check_membership(self, chat_ids: list):
+        """Vérifie l'accès de chaque client à chaque canal de sortie."""
+        for member in self.members:
+            for chat_id in chat_ids:
+                try:
+                    await member.client.get_entity(chat_id)
+                    member.chats[chat_id] = True
+                except Exception as e:
+                    member.chats[chat_id] = False
+                    logger.warning(f"Client {member.name} sans accès au canal {chat_id}: {e}")
+
+    def status_lines(self) -> list:
+        total = sum(m.calls for m in self.members) or 1
+        lines = []
+        for member in self.members:
+            health = '✅' if member.is_healthy() else '❌'
+            member_of = sum(1 for ok in member.chats.values() if ok)
+            lines.append(
+                f"• {health} {member.name}: {member.calls} appels ({member.calls * 100 / total:.0f}%), "
+                f"{member.total_failures} erreurs, débit dispo {member.limiter.available():.1f}, "
+                f"membre de {member_of}/{len(member.chats)} canaux"
+            )
+        return lines
+
+class OutputChannel:
+    """Un canal de sortie : file, travailleur, débit et identifiants de messages."""
+
+    def __init__(self, name: str, chat_id: int, pool: ClientPool, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.name = name
+        self.chat_id = chat_id
+        self.pool = pool
+        self.limiter = RateLimiter(rate, burst)
+        self.message_ids = {}   # jeu cible -> (message_id, client qui l'a envoyé)
+        self.queue = asyncio.Queue()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.sent = 0
+        self.edited = 0
+        self.errors = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name=f"output-{self.name}")
+        return self._task
+
+    def submit(self, effect):
+        self.queue.put_nowait((time.monotonic(), effect))
+
+    def reset(self):
+        self.message_ids.clear()
+
+    async def run(self):
+        while True:
+            enqueued_at, effect = await self.queue.get()
+            try:
+                if await self.deliver(effect):
+                    self.latencies.append(time.monotonic() - enqueued_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Erreur canal {self.name}: {e}")
+
+    async def deliver(self, effect) -> bool:
+        """Exécute l'effet sur ce canal ; retourne True si un appel réseau a réussi."""
+        if isinstance(effect, SendPrediction):
+            return await self._send(effect)
+        if isinstance(effect, EditPrediction):
+            return await self._edit(effect)
+        return False
+
+    async def _call(self, method: str, *args, member: PoolMember = None):
+        """
+        Appel réseau limité en débit (canal puis client), avec reprise après FloodWait.
+
+        member impose le client (éditions) ; sinon le pool choisit, et la
+        reprise d'un envoi passe par un autre client s'il y en a un. Seul ce
+        canal attend la fin d'un FloodWait.
+        Returns:
+            (résultat, client utilisé)
+        """
+        for attempt in range(FLOOD_RETRIES + 1):
+            await self.limiter.acquire()
+            current = member or self.pool.pick(self.chat_id)
+            if current is None:
+                raise RuntimeError(f"Aucun client disponible pour le canal {self.chat_id}")
+            flood_left = current.flood_left(self.chat_id)
+            if flood_left:
+                await asyncio.sleep(flood_left)
+            await current.limiter.acquire()
+            try:
+                result = await getattr(current.client, method)(self.chat_id, *args)
+            except Exception as e:
+                current.record_failure(self.chat_id, e)
+                seconds = flood_wait_seconds(e)
+                if seconds is None or attempt == FLOOD_RETRIES:
+                    raise
+                logger.warning(f"⏳ FloodWait {seconds}s pour {current.name} sur le canal {self.name}")
+                current.flood(self.chat_id, seconds)
+                continue
+            current.record_success()
+            return result, current
+
+    async def _send(self, effect: SendPrediction) -> bool:
+        try:
+            # Tenter d'envoyer le message même si la vérification au démarrage a échoué
+            pred_msg, member = await self._call('send_message', effect.text)
+        except Exception as e:
+            self.errors += 1
+            log_send_error(self.chat_id, e)
+            # La prédiction reste en mémoire dans le moteur (mode offline)
+            logger.warning(f"   → La prédiction est conservée en mémoire mais n'a pas été envoyée au canal.")
+            return False
+        if not effect.final:
+            self.message_ids[effect.target_game] = (pred_msg.id, member)
+        self.sent += 1
+        logger.info(f"✅ Prédiction envoyée au canal {self.chat_id} par {member.name} (msg_id: {pred_msg.id}, jeu #{effect.target_game}, {suit_name(effect.suit)})")
+        return True
+
+    async def _edit(self, effect: EditPrediction) -> bool:
+        if effect.final:
+            sent = self.message_ids.pop(effect.target_game, None)
+        else:
+            sent = self.message_ids.get(effect.target_game)
+        if sent is None:
+            return False
+        message_id, member = sent
+        try:
+            # Un bot ne peut éditer que ses propres messages : même client que l'envoi
+            await self._call('edit_message', message_id, effect.text, member=member)
+        except Exception as e:
+            # Ne pas bloquer si la mise à jour échoue, la prédiction reste en mémoire
+            self.errors += 1
+            logger.error(f"❌ Erreur mise à jour statut prédiction #{effect.target_game} ({self.name}): {e}")
+            return False
+        self.edited += 1
+        return True
+
+    def latency_stats(self) -> dict:
+        """Latence de livraison (file + débit + réseau) en secondes."""
+        samples = sorted(self.latencies)
+        if not samples:
+            return {'count': 0, 'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+        return {
+            'count': len(samples),
+            'avg': sum(samples) / len(samples),
+            'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            'max': samples[-1],
+        }
+
+class Publisher:
+    """Diffuse chaque effet du moteur vers tous les canaux de sortie."""
+
+    def __init__(self, channels: list):
+        self.channels = channels
+
+    def start(self):
+        for channel in self.channels:
+            channel.start()
+
+    def reset(self):
+        for channel in self.channels:
+            channel.reset()
+
+    def submit(self, effects: list):
+        """Dépose les effets dans la file de chaque canal sans attendre la livraison."""
+        for effect in effects:
+            for channel in self.channels:
+                channel.submit(effect)
+
+    def queued(self) -> int:
+        """Effets en attente de livraison, tous canaux confondus."""
+        return sum(channel.queue.qsize() for channel in self.channels)
+
+    def status_lines(self) -> list:
+        lines = []
+        for channel in self.channels:
+            lat = channel.latency_stats()
+            lines.append(
+                f"• {channel.name} ({channel.chat_id}): {channel.sent} envoyés, {channel.edited} édités, "
+                f"{channel.errors} erreurs, {channel.queue.qsize()} en file, "
+                f"latence moy {lat['avg']*1000:.0f}ms / p95 {lat['p95']*1000:.0f}ms"
+            )
+        return lines
@@ -0,0 +1,170 @@
+"""
+Diagnostics à la demande pour l'administrateur (profil CPU, mémoire, tâches).
+
+Rien n'est actif par défaut : le profileur par échantillonnage est un thread
+créé pour la durée de la mesure uniquement, et tracemalloc n'est démarré
+qu'au premier instantané mémoire (puis arrêté sur demande). En dehors de
+ces commandes, le coût est donc nul.
+"""
+import sys
+import time
+import asyncio
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PROFILE_INTERVAL = 0.005   # Secondes entre deux échantillons
+PROFILE_MAX_SECONDS = 120  # Durée maximale d'un profil
+PROFILE_TOP = 30           # Fonctions listées dans le rapport
+MEMORY_TOP = 25            # Lignes listées dans un diff mémoire
+TRACEMALLOC_FRAMES = 5     # Profondeur des traces d'allocation
+
+# Feuille de pile quand la boucle attend des événements (boucle inactive)
+IDLE_FRAME = ('selectors.py', 'select')
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+
+class _Sampler(threading.Thread):
+    """Échantillonne la pile du thread de la boucle à intervalle fixe."""
+
+    def __init__(self, thread_id: int, seconds: float, interval: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.seconds = seconds
+        self.interval = interval
+        self.samples = 0
+        self.idle = 0
+        self.own = Counter()        # Fonction en cours d'exécution (temps propre)
+        self.inclusive = Counter()  # Fonction présente dans la pile (temps cumulé)
+
+    def run(self):
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._record(frame)
+            time.sleep(self.interval)
+
+    def _record(self, frame):
+        self.samples += 1
+        code = frame.f_code
+        if code.co_name == IDLE_FRAME[1] and code.co_filename.endswith(IDLE_FRAME[0]):
+            self.idle += 1
+            return
+        self.own[_frame_label(frame)] += 1
+        seen = set()
+        while frame is not None:
+            label = _frame_label(frame)
+            if label not in seen:
+                seen.add(label)
+                self.inclusive[label] += 1
+            frame = frame.f_back
+
+async def profile_event_loop(seconds: float, interval: float = PROFILE_INTERVAL, top: int = PROFILE_TOP) -> str:
+    """
+    Profil CPU par échantillonnage de la boucle d'événements pendant seconds.
+
+    Le thread de mesure n'existe que pendant l'appel ; la boucle continue
+    de traiter les messages normalement.
+    Returns:
+        rapport texte (fonctions les plus présentes, temps propre et cumulé)
+    """
+    seconds = max(0.1, min(float(seconds), PROFILE_MAX_SECONDS))
+    sampler = _Sampler(threading.get_ident(), seconds, interval)
+    sampler.start()
+    while sampler.is_alive():
+        await asyncio.sleep(0.05)
+
+    total = sampler.samples or 1
+    busy = sampler.samples - sampler.idle
+    lines = [
+        f"Profil de la boucle d'événements : {seconds:.1f}s, {sampler.samples} échantillons "
+        f"(intervalle {interval * 1000:.1f}ms)",
+        f"Boucle occupée : {busy * 100 / total:.1f}% - inactive : {sampler.idle * 100 / total:.1f}%",
+        "",
+        f"Top {top} - temps propre (fonction en cours d'exécution) :",
+    ]
+    for label, count in sampler.own.most_common(top):
+        lines.append(f"{count * 100 / total:6.1f}%  {count:6d}  {label}")
+    lines += ["", f"Top {top} - temps cumulé (fonction présente dans la pile) :"]
+    for label, count in sampler.inclusive.most_common(top):
+        lines.append(f"{count * 100 / total:6.1f}%  {count:6d}  {label}")
+    return "\n".join(lines)
+
+class MemoryTracker:
+    """Instantanés tracemalloc successifs ; chaque rapport est un diff avec le précédent."""
+
+    def __init__(self):
+        self.previous = None
+        self.taken_at = None
+
+    @property
+    def active(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def snapshot(self, top: int = MEMORY_TOP) -> str:
+        """Prend un instantané (démarre tracemalloc si besoin) et le compare au précédent."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self.previous = None
+            logger.info("tracemalloc démarré")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        now = time.monotonic()
+
+        lines = [f"Mémoire tracée : {current / 1024:.1f} Ko (pic {peak / 1024:.1f} Ko)"]
+        if self.previous is None:
+            lines += ["Premier instantané : tracemalloc vient de démarrer, relancez /mem pour un diff.",
+                      "", f"Top {top} des allocations :"]
+            for stat in snapshot.statistics('lineno')[:top]:
+                lines.append(str(stat))
+        else:
+            lines += [f"Diff avec l'instantané d'il y a {now - self.taken_at:.0f}s :", ""]
+            for stat in snapshot.compare_to(self.previous, 'lineno')[:top]:
+                lines.append(str(stat))
+
+        self.previous = snapshot
+        self.taken_at = now
+        return "\n".join(lines)
+
+    def stop(self):
+        """Arrête tracemalloc et libère le dernier instantané."""
+        self.previous = None
+        self.taken_at = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc arrêté")
+
+def container_sizes(containers: dict) -> str:
+    """Nombre d'éléments de chaque conteneur global (conteneur ou taille déjà calculée)."""
+    width = max((len(name) for name in containers), default=0)
+    return "\n".join(
+        f"{name.ljust(width)}  {value if isinstance(value, int) else len(value)}"
+        for name, value in containers.items()
+    )
+
+def task_counts() -> str:
+    """Tâches de la boucle d'événements, regroupées par coroutine."""
+    loop = asyncio.get_running_loop()
+    tasks = asyncio.all_tasks(loop)
+    by_coro = Counter()
+    for task in tasks:
+        coro = task.get_coro()
+        by_coro[getattr(coro, '__qualname__', type(coro).__name__)] += 1
+
+    # Files internes de la boucle (attributs privés d'asyncio, absents sur d'autres boucles)
+    ready = len(getattr(loop, '_ready', ()))
+    scheduled = len(getattr(loop, '_scheduled', ()))
+    lines = [f"Tâches : {len(tasks)} - callbacks prêts : {ready} - minuteurs programmés : {scheduled}", ""]
+    for name, count in by_coro.most_common():
+        lines.append(f"{count:5d}  {name}")
+    return "\n".join(lines)
@@ -0,0 +1,651 @@
+"""
+Cœur de décision synchrone du bot de prédiction Baccarat.
+
+Le moteur consomme des événements déjà analysés (résultats du canal source 1,
+statistiques du canal source 2) et retourne la liste des effets sortants
+(envoi ou édition de messages) sans jamais toucher au réseau. La couche
+asynchrone de main.py exécute ensuite ces effets.
+"""
+import re
+import logging
+from array import array
+from dataclasses import dataclass, replace
+from datetime import timedelta
+from typing import Optional
+from suits import SUIT_COUNT, NO_SUIT, parse_suit_mask, mask_has, suit_name
+from strategy import StrategyConfig, DEFAULT_STRATEGY
+from clock import REAL_CLOCK
+
+logger = logging.getLogger(__name__)
+
+# Paramètres de règle : voir strategy.py (valeurs par défaut et modification à chaud)
+MAX_RATTRAPAGE = 3           # Nombre de rattrapages après le jeu cible
+RESULT_RING_SIZE = 1024      # Résultats récents conservés pour résoudre les prédictions tardives
+RESTART_GAP = 100            # Recul du numéro au-delà duquel on considère une nouvelle numérotation
+
+FINAL_STATUSES = ('✅0️⃣', '✅1️⃣', '✅2️⃣', '✅3️⃣', '❌')
+
+# --- Événements entrants ---
+
+@dataclass(frozen=True)
+class ResultEvent:
+    """Résultat finalisé d'un jeu (canal source 1)."""
+    game_number: int
+    message_key: str                   # Clé de déduplication (numéro + début du message)
+    first_mask: Optional[int] = None   # Masque des costumes du premier groupe, None si absent
+
+@dataclass(frozen=True)
+class StatsEvent:
+    """Statistiques des costumes (canal source 2), indexées par costume (-1 si absent)."""
+    stats: tuple
+
+# --- Effets sortants ---
+
+@dataclass(frozen=True)
+class SendPrediction:
+    """Envoyer un nouveau message de prédiction."""
+    target_game: int
+    suit: int
+    text: str
+    final: bool = False
+
+@dataclass(frozen=True)
+class EditPrediction:
+    """Éditer le message de prédiction déjà envoyé pour ce jeu."""
+    target_game: int
+    text: str
+    final: bool = False
+
+# --- Fonctions d'Analyse ---
+
+def is_prediction_time_allowed(strategy: StrategyConfig = DEFAULT_STRATEGY, clock=REAL_CLOCK):
+    """
+    Vérifie si l'heure actuelle permet l'envoi de prédictions automatiques.
+
+    Règles (par défaut):
+    - Prédictions autorisées aux heures pile (XX:00) jusqu'à XX:29
+    - Prédictions bloquées de XX:30 à XX:59 (attendre l'heure suivante)
+
+    Returns:
+        tuple: (bool, str) - (autorisé, message explicatif)
+    """
+    now = clock.now()
+    current_minute = now.minute
+    start, end = strategy.window_start_minute, strategy.window_end_minute
+
+    if not start <= current_minute < end:
+        wait_minutes = (start - current_minute) % 60
+        next_window = (now + timedelta(minutes=wait_minutes)).replace(minute=start, second=0, microsecond=0)
+        return False, f"🚫 Prédictions bloquées (H:{end:02d}-H:{(start - 1) % 60:02d}). Prochaine fenêtre à {next_window.strftime('%H:%M')} (dans {wait_minutes}min)"
+
+    return True, f"✅ Prédictions autorisées ({now.strftime('%H:%M')}, jusqu'à H:{end:02d})"
+
+# Pattern plus flexible pour #N59 ou #N 59
+GAME_NUMBER_PATTERN = re.compile(r"#N\s*(\d+)", re.IGNORECASE)
+# Contenu entre parenthèses (groupes de cartes)
+PARENTHESES_PATTERN = re.compile(r"\(([^)]*)\)")
+
+def extract_game_number(message: str):
+    """Extrait le numéro de jeu du message."""
+    match = GAME_NUMBER_PATTERN.search(message)
+    if match:
+        return int(match.group(1))
+    return None
+
+# Pattern pour extraire : ♠️ : 9 (23.7 %), un par costume (ordre des indices)
+STATS_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'♠️?\s*:\s*(\d+)',
+    r'♥️?\s*:\s*(\d+)',
+    r'♦️?\s*:\s*(\d+)',
+    r'♣️?\s*:\s*(\d+)',
+))
+
+def parse_stats_message(message: str) -> tuple:
+    """Extrait les statistiques du canal source 2 (-1 pour un costume absent)."""
+    stats = []
+    for pattern in STATS_PATTERNS:
+        match = pattern.search(message)
+        stats.append(int(match.group(1)) if match else -1)
+    return tuple(stats)
+
+def get_predicted_suit(missing_suit: int, strategy: StrategyConfig = DEFAULT_STRATEGY) -> int:
+    """Applique le mapping personnalisé (couleur manquante -> couleur prédite)."""
+    return strategy.suit_mapping[missing_suit]
+
+def find_mirror_signal(stats: tuple, strategy: StrategyConfig = DEFAULT_STRATEGY):
+    """
+    Cherche le premier couple de miroirs dont le décalage atteint le seuil.
+
+    Returns:
+        tuple (costume prédit, s1, v1, s2, v2, diff) ou None
+    """
+    for s1, s2 in strategy.mirror_pairs:
+        v1, v2 = stats[s1], stats[s2]
+        if v1 >= 0 and v2 >= 0:
+            diff = abs(v1 - v2)
+            if diff >= strategy.mirror_threshold:
+                # Prédire le plus faible parmi les deux miroirs
+                return (s1 if v1 < v2 else s2), s1, v1, s2, v2, diff
+    return None
+
+def is_message_finalized(message: str) -> bool:
+    """Vérifie si le message est un résultat final (non en cours)."""
+    if '⏰' in message:
+        return False
+    # Accepter les messages qui ont un résultat (par exemple "▶️") ou les symboles de validation
+    return '✅' in message or '🔰' in message or '▶️' in message
+
+def parse_source_message(message_text: str, is_stats_channel: bool):
+    """
+    Transforme un message brut d'un canal source en événement pour le moteur.
+
+    Returns:
+        ResultEvent, StatsEvent ou None si le message doit être ignoré
+    """
+    if is_stats_channel:
+        return StatsEvent(parse_stats_message(message_text))
+
+    if not is_message_finalized(message_text):
+        return None
+
+    game_number = extract_game_number(message_text)
+    if game_number is None:
+        return None
+
+    # Utilisation du premier groupe (index 0) : inutile d'extraire les suivants
+    first_group = PARENTHESES_PATTERN.search(message_text)
+    first_mask = parse_suit_mask(first_group.group(1)) if first_group else None
+    return ResultEvent(game_number, f"{game_number}_{message_text[:50]}", first_mask)
+
+def format_prediction_message(target_game: int, suit: int, result_text: str = '⏳') -> str:
+    """Construit le texte du message de prédiction."""
+    return f"""🤖 joueur#N:{target_game}
+🔰Couleur de la carte :{suit_name(suit)}
+🔰 Rattrapages : 3(🔰+3)
+🧨 Résultats : {result_text}"""
+
+def coalesce_effects(effects: list) -> list:
+    """
+    Fusionne les effets d'un lot avant exécution.
+
+    - Plusieurs éditions du même jeu : seule la dernière est conservée
+    - Une édition d'un message envoyé dans le même lot : le texte final est
+      directement intégré à l'envoi
+    """
+    out = []
+    send_index = {}
+    edit_index = {}
+    for effect in effects:
+        game = effect.target_game
+        if isinstance(effect, SendPrediction):
+            send_index[game] = len(out)
+            edit_index.pop(game, None)
+            out.append(effect)
+        elif game in send_index:
+            idx = send_index[game]
+            out[idx] = replace(out[idx], text=effect.text, final=effect.final)
+        else:
+            if game in edit_index:
+                out[edit_index[game]] = None
+            edit_index[game] = len(out)
+            out.append(effect)
+    return [effect for effect in out if effect is not None]
+
+# --- Résultats récents ---
+
+class ResultRing:
+    """
+    Masque du premier groupe des derniers jeux, indexé par numéro de jeu.
+
+    Deux tableaux de taille fixe (case = numéro modulo la taille) : lecture et
+    écriture en O(1), sans allocation par jeu. Une case réutilisée par un jeu
+    plus récent n'est plus visible pour l'ancien numéro.
+    """
+
+    def __init__(self, size: int = RESULT_RING_SIZE):
+        self.size = size
+        self.games = array('q', [-1]) * size   # Numéro de jeu occupant chaque case
+        self.masks = bytearray(size)           # Masque de costumes de ce jeu
+
+    def record(self, game_number: int, mask: int):
+        slot = game_number % self.size
+        self.games[slot] = game_number
+        self.masks[slot] = mask
+
+    def get(self, game_number: int) -> Optional[int]:
+        """Masque du jeu s'il a déjà été vu, None sinon."""
+        slot = game_number % self.size
+        if self.games[slot] != game_number:
+            return None
+        return self.masks[slot]
+
+    def __len__(self) -> int:
+        return self.size - self.games.count(-1)
+
+# --- Moteur de Prédiction ---
+
+class PredictionEngine:
+    """
+    État complet de la stratégie et transitions synchrones.
+
+    Tous les paramètres de règle sont lus via self.strategy ; set_strategy()
+    remplace la version entière entre deux événements. L'heure est lue via
+    self.clock (RealClock en production, VirtualClock en simulation).
+
+    Un recul du numéro de jeu de plus de RESTART_GAP (numérotation redémarrée
+    par la source, parfois avant le reset de 00h59) efface les résultats
+    récents et les messages déjà traités : un numéro du nouveau cycle n'est
+    jamais confondu avec le même numéro du cycle précédent.
+    """
+
+    def __init__(self, strategy: StrategyConfig = DEFAULT_STRATEGY, clock=REAL_CLOCK):
+        self.strategy = strategy
+        self.clock = clock
+        self.reset()
+
+    @property
+    def user_a(self) -> int:
+        return self.strategy.user_a
+
+    def set_strategy(self, strategy: StrategyConfig):
+        """Remplace atomiquement les paramètres ; l'état des prédictions est conservé."""
+        previous = self.strategy
+        self.strategy = strategy
+        logger.info(f"⚙️ Stratégie v{previous.version} -> v{strategy.version} ({strategy.source})")
+
+    def reset(self):
+        """Efface toutes les données de prédiction (reset quotidien)."""
+        # Prédictions actives (déjà envoyées au canal de prédiction)
+        self.pending_predictions = {}
+        # Prédictions en attente (prêtes à être envoyées dès que la distance est bonne)
+        self.queued_predictions = {}
+        # Résultats déjà vus (premier groupe), pour résoudre les prédictions activées après coup
+        self.recent_games = ResultRing()
+        self.processed_messages = set()
+        self.current_game_number = 0
+        self.last_source_game_number = 0
+
+        # LOGIQUE DE BLOCAGE (MAX 3 PRÉDICTIONS CONSÉCUTIVES)
+        # Tableaux de taille fixe indexés par costume (0..3)
+        self.suit_consecutive_counts = [0] * SUIT_COUNT               # Compteur de prédictions consécutives
+        self.suit_results_history = [[] for _ in range(SUIT_COUNT)]   # Historique des 3 derniers résultats
+        self.suit_block_until = [None] * SUIT_COUNT                   # Fin de blocage (None si libre)
+        self.last_predicted_suit = NO_SUIT                            # Dernier costume prédit (pour détecter les changements)
+        self.suit_first_prediction_time = [None] * SUIT_COUNT         # Première prédiction consécutive (pour les 30min)
+
+    # --- Points d'entrée ---
+
+    def process(self, event) -> list:
+        """Traite un événement et retourne les effets à exécuter."""
+        effects = []
+        self._apply(event, effects)
+        return effects
+
+    def process_batch(self, events) -> list:
+        """Traite un lot d'événements dans l'ordre et retourne les effets fusionnés."""
+        effects = []
+        apply = self._apply
+        for event in events:
+            apply(event, effects)
+        return coalesce_effects(effects)
+
+    def _apply(self, event, effects: list):
+        try:
+            if isinstance(event, ResultEvent):
+                self._on_result(event, effects)
+            elif isinstance(event, StatsEvent):
+                self._on_stats(event, effects)
+        except Exception as e:
+            logger.error(f"Erreur traitement: {e}")
+
+    def _on_result(self, event: ResultEvent, effects: list):
+        game_number = event.game_number
+        if game_number < self.last_source_game_number - RESTART_GAP:
+            self.restart_numbering(game_number)
+        self.current_game_number = game_number
+        self.last_source_game_number = game_number
+
+        # Hash pour éviter doublons
+        if event.message_key in self.processed_messages:
+            return
+        self.processed_messages.add(event.message_key)
+
+        if event.first_mask is None:
+            return
+
+        self.recent_games.record(game_number, event.first_mask)
+
+        # Vérification des résultats
+        self.check_prediction_result(game_number, event.first_mask, effects)
+        # Envoi des files d'attente
+        self.flush_queued_predictions(game_number, effects)
+
+    def _on_stats(self, event: StatsEvent, effects: list):
+        self.process_stats(event.stats)
+        # Après traitement du canal 2, on force la vérification de l'envoi
+        self.flush_queued_predictions(self.current_game_number, effects)
+
+    def restart_numbering(self, game_number: int):
+        """Oublie les résultats du cycle précédent (même règle que ReorderBuffer)."""
+        logger.info(f"Numérotation redémarrée (#{self.last_source_game_number} -> #{game_number}), résultats récents effacés")
+        self.recent_games = ResultRing()
+        self.processed_messages.clear()
+
+    # --- File d'attente ---
+
+    def queue_prediction(self, target_game: int, predicted_suit: int, base_game: int, rattrapage=0, original_game=None):
+        """Met une prédiction en file d'attente pour un envoi différé."""
+        # Vérification d'unicité
+        if target_game in self.queued_predictions or (target_game in self.pending_predictions and rattrapage == 0):
+            return False
+
+        self.queued_predictions[target_game] = {
+            'target_game': target_game,
+            'predicted_suit': predicted_suit,
+            'base_game': base_game,
+            'rattrapage': rattrapage,
+            'original_game': original_game,
+            'queued_at': self.clock.now().isoformat()
+        }
+        logger.info(f"📋 Prédiction #{target_game} mise en file d'attente (Rattrapage {rattrapage})")
+        return True
+
+    def flush_queued_predictions(self, current_game: int, effects: list):
+        """Vide la file d'attente vers les prédictions actives."""
+        self.current_game_number = current_game
+
+        # Une prédiction résolue à l'activation peut en remettre une en file (rattrapage suivant)
+        while self.queued_predictions:
+            pred_data = self.queued_predictions.pop(min(self.queued_predictions))
+            self.activate_prediction(
+                pred_data['target_game'],
+                pred_data['predicted_suit'],
+                pred_data['base_game'],
+                effects,
+                pred_data.get('rattrapage', 0),
+                pred_data.get('original_game')
+            )
+
+    def activate_prediction(self, target_game: int, predicted_suit: int, base_game: int, effects: list, rattrapage=0, original_game=None):
+        """Enregistre une prédiction active et émet l'envoi du message si nécessaire."""
+        # Si c'est un rattrapage, on ne crée pas un nouveau message, on garde la trace
+        if rattrapage > 0:
+            self.pending_predictions[target_game] = {
+                'suit': predicted_suit,
+                'base_game': base_game,
+                'status': '🔮',
+                'rattrapage': rattrapage,
+                'original_game': original_game,
+                'created_at': self.clock.now().isoformat()
+            }
+            logger.info(f"Rattrapage {rattrapage} actif pour #{target_game} (Original #{original_game})")
+            self.resolve_from_recent(target_game, effects)
+            return
+
+        self.pending_predictions[target_game] = {
+            'suit': predicted_suit,
+            'base_game': base_game,
+            'status': '🔮',
+            'check_count': 0,
+            'rattrapage': 0,
+            'created_at': self.clock.now().isoformat()
+        }
+        effects.append(SendPrediction(target_game, predicted_suit, format_prediction_message(target_game, predicted_suit)))
+        logger.info(f"Prédiction active enregistrée: Jeu #{target_game} - {suit_name(predicted_suit)}")
+        self.resolve_from_recent(target_game, effects)
+
+    def resolve_from_recent(self, target_game: int, effects: list):
+        """Vérifie immédiatement une prédiction dont le résultat du jeu cible est déjà connu."""
+        first_mask = self.recent_games.get(target_game)
+        if first_mask is None:
+            return
+        logger.info(f"Résultat du jeu #{target_game} déjà connu, vérification immédiate")
+        self.check_prediction_result(target_game, first_mask, effects)
+
+    # --- Résultats ---
+
+    def update_prediction_status(self, game_number: int, new_status: str, effects: list):
+        """Met à jour le statut d'une prédiction et émet l'édition du message."""
+        if game_number not in self.pending_predictions:
+            return False
+
+        pred = self.pending_predictions[game_number]
+        suit = pred['suit']
+
+        # Déterminer le texte du résultat selon le statut
+        if '✅' in new_status:
+            result_text = f"{new_status} GAGNÉ"
+        elif '❌' in new_status:
+            result_text = f"{new_status} PERDU"
+        else:
+            result_text = new_status
+
+        final = new_status in FINAL_STATUSES
+        effects.append(EditPrediction(game_number, format_prediction_message(game_number, suit, result_text), final))
+
+        # --- GESTION DES RÉSULTATS ---
+        history = self.suit_results_history[suit]
+
+        # Ajouter le nouveau résultat à l'historique (garder les 3 derniers)
+        history.append(new_status)
+        if len(history) > 3:
+            history.pop(0)
+
+        # Vérifier si on a 3 résultats pour ce costume
+        if len(history) == 3:
+            logger.info(f"3 résultats consécutifs pour {suit_name(suit)}: {history}")
+
+            # CAS 1 : Si au moins un ❌ dans les 3 résultats
+            if '❌' in history:
+                logger.info(f"❌ détecté pour {suit_name(suit)} → Lancement immédiat au numéro suivant")
+
+                # Lancer immédiatement une nouvelle prédiction pour le même costume
+                if self.last_source_game_number > 0:
+                    target_game = self.last_source_game_number + 1
+                    self.queue_prediction(target_game, suit, self.last_source_game_number)
+
+                # Puis bloquer ce costume (5 minutes par défaut)
+                block_until = self.clock.now() + timedelta(minutes=self.strategy.result_block_minutes)
+                self.suit_block_until[suit] = block_until
+                self.suit_consecutive_counts[suit] = 0  # Réinitialiser le compteur
+                logger.info(f"{suit_name(suit)} bloqué jusqu'à {block_until}")
+
+            # CAS 2 : Si 3 succès consécutifs (tous ✅)
+            elif all('✅' in result for result in history):
+                logger.info(f"3 succès consécutifs pour {suit_name(suit)} → Blocage {self.strategy.result_block_minutes:g} minutes")
+                block_until = self.clock.now() + timedelta(minutes=self.strategy.result_block_minutes)
+                self.suit_block_until[suit] = block_until
+                self.suit_consecutive_counts[suit] = 0  # Réinitialiser le compteur
+                logger.info(f"{suit_name(suit)} bloqué jusqu'à {block_until}")
+
+            # Réinitialiser l'historique après traitement
+            history.clear()
+
+        # Mettre à jour le statut de la prédiction
+        pred['status'] = new_status
+
+        # Supprimer si terminé
+        if final:
+            del self.pending_predictions[game_number]
+
+        return True
+
+    def check_prediction_result(self, game_number: int, first_mask: int, effects: list):
+        """Vérifie les résultats selon la séquence ✅0️⃣, ✅1️⃣, ✅2️⃣, ✅3️⃣ ou ❌."""
+        pending = self.pending_predictions
+
+        # 1. Vérification pour le jeu actuel (Cible N)
+        if game_number in pending:
+            pred = pending[game_number]
+            if pred.get('rattrapage', 0) == 0:
+                target_suit = pred['suit']
+                if mask_has(first_mask, target_suit):
+                    self.update_prediction_status(game_number, '✅0️⃣', effects)
+                    return
+                else:
+                    # Échec N, on lance le rattrapage 1 pour N+1
+                    next_target = game_number + 1
+                    self.queue_prediction(next_target, target_suit, pred['base_game'], rattrapage=1, original_game=game_number)
+                    logger.info(f"Échec # {game_number}, Rattrapage 1 planifié pour #{next_target}")
+
+        # 2. Vérification pour les rattrapages (N-1, N-2, N-3)
+        pred = pending.get(game_number)
+        if pred is None or pred.get('rattrapage', 0) == 0:
+            return
+
+        original_game = pred.get('original_game', game_number - pred['rattrapage'])
+        target_suit = pred['suit']
+        rattrapage_actuel = pred['rattrapage']
+
+        if mask_has(first_mask, target_suit):
+            # Trouvé ! On met à jour le statut avec le bon numéro de rattrapage
+            self.update_prediction_status(original_game, f'✅{rattrapage_actuel}️⃣', effects)
+            # On supprime aussi l'entrée de rattrapage si elle est différente de l'originale
+            if game_number != original_game:
+                pending.pop(game_number, None)
+        elif rattrapage_actuel < MAX_RATTRAPAGE:
+            # Continuer la séquence
+            next_rattrapage = rattrapage_actuel + 1
+            next_target = game_number + 1
+            self.queue_prediction(next_target, target_suit, pred['base_game'], rattrapage=next_rattrapage, original_game=original_game)
+            logger.info(f"Échec rattrapage {rattrapage_actuel} sur #{game_number}, Rattrapage {next_rattrapage} planifié pour #{next_target}")
+            # Supprimer le rattrapage échoué pour laisser place au suivant
+            pending.pop(game_number, None)
+        else:
+            # Échec final après 3 rattrapages
+            self.update_prediction_status(original_game, '❌', effects)
+            if game_number != original_game:
+                pending.pop(game_number, None)
+            logger.info(f"Échec final pour la prédiction originale #{original_game} après 3 rattrapages")
+
+    # --- Blocage des costumes ---
+
+    def can_predict_suit(self, predicted_suit: int) -> tuple[bool, str]:
+        """
+        Vérifie si un costume peut être prédit selon la règle des 3 consécutives.
+
+        Règles:
+        - Maximum 3 prédictions consécutives du même costume
+        - Après 3 prédictions, le costume est bloqué jusqu'à:
+          1. Un autre costume soit prédit (changement de costume)
+          2. OU après la pause (30 minutes par défaut)
+
+        Returns:
+            (bool, str): (peut prédire, raison si bloqué)
+        """
+        counts = self.suit_consecutive_counts
+        blocks = self.suit_block_until
+        first_times = self.suit_first_prediction_time
+        last_suit = self.last_predicted_suit
+        name = suit_name(predicted_suit)
+        now = self.clock.now()
+        pause = timedelta(minutes=self.strategy.streak_pause_minutes)
+
+        # Si c'est un nouveau costume différent du dernier prédit
+        if last_suit != NO_SUIT and last_suit != predicted_suit:
+            # Réinitialiser le compteur et le blocage du dernier costume
+            logger.info(f"Changement de costume: {suit_name(last_suit)} -> {name}. Réinitialisation des compteurs.")
+            counts[last_suit] = 0
+            blocks[last_suit] = None
+            first_times[last_suit] = None
+            # Réinitialiser aussi le compteur du nouveau costume (car c'est un changement)
+            counts[predicted_suit] = 0
+            blocks[predicted_suit] = None
+            first_times[predicted_suit] = None
+            return True, ""
+
+        # Vérifier si le costume est actuellement bloqué
+        block_until = blocks[predicted_suit]
+        if block_until is not None:
+            if now < block_until:
+                remaining = block_until - now
+                logger.info(f"{name} est bloqué. Temps restant: {remaining.seconds//60}min {remaining.seconds%60}s")
+                return False, f"{name} bloqué pendant encore {remaining.seconds//60}min"
+            else:
+                # Le blocage est terminé, on peut prédire
+                logger.info(f"Blocage terminé pour {name}. Prédiction autorisée.")
+                blocks[predicted_suit] = None
+                # Réinitialiser le compteur mais garder trace du temps pour les futures vérifications
+                counts[predicted_suit] = 1
+                first_times[predicted_suit] = now
+                return True, ""
+
+        # Vérifier le compteur de prédictions consécutives
+        if counts[predicted_suit] >= 3:
+            # Le costume a déjà été prédit 3 fois consécutivement
+            # Vérifier si les 30 minutes sont écoulées depuis la première prédiction
+            first_time = first_times[predicted_suit]
+            if first_time is not None:
+                elapsed = now - first_time
+                if elapsed >= pause:
+                    logger.info(f"Pause écoulée pour {name}. Réinitialisation et prédiction autorisée.")
+                    counts[predicted_suit] = 1
+                    first_times[predicted_suit] = now
+                    return True, ""
+                else:
+                    # Pas encore 30 minutes, bloquer
+                    remaining = pause - elapsed
+                    blocks[predicted_suit] = first_time + pause
+                    logger.info(f"{name} a atteint 3 prédictions. Bloqué encore {remaining.seconds//60}min")
+                    return False, f"{name} en pause ({remaining.seconds//60}min restantes)"
+            else:
+                # Pas de timestamp enregistré, bloquer par précaution
+                blocks[predicted_suit] = now + pause
+                first_times[predicted_suit] = now
+                logger.info(f"{name} bloqué pour {self.strategy.streak_pause_minutes:g}min (3 prédictions consécutives)")
+                return False, f"{name} bloqué {self.strategy.streak_pause_minutes:g}min (3 prédictions)"
+
+        # Le costume peut être prédit
+        return True, ""
+
+    def increment_suit_counter(self, predicted_suit: int):
+        """Incrémente le compteur de prédictions consécutives pour un costume."""
+        counts = self.suit_consecutive_counts
+
+        # Si c'est la première prédiction de ce costume ou si on revient après un changement
+        if counts[predicted_suit] == 0:
+            self.suit_first_prediction_time[predicted_suit] = self.clock.now()
+            counts[predicted_suit] = 1
+        else:
+            counts[predicted_suit] += 1
+
+        self.last_predicted_suit = predicted_suit
+
+        logger.info(f"Compteur {suit_name(predicted_suit)}: {counts[predicted_suit]}/3 consécutives")
+
+    # --- Statistiques (canal source 2) ---
+
+    def process_stats(self, stats: tuple):
+        """Traite les statistiques du canal 2 selon les miroirs ♦️<->♠️ et ❤️<->♣️."""
+        # --- VÉRIFICATION HORAIRE ---
+        strategy = self.strategy
+        can_send, time_message = is_prediction_time_allowed(strategy, self.clock)
+        if not can_send:
+            logger.info(f"⏰ {time_message}")
+            return False
+
+        if max(stats) < 0:
+            return False
+
+        signal = find_mirror_signal(stats, strategy)
+        if signal is None:
+            return False
+        predicted_suit, s1, v1, s2, v2, diff = signal
+
+        # Vérifier si ce costume peut être prédit
+        can_predict, reason = self.can_predict_suit(predicted_suit)
+
+        if not can_predict:
+            logger.info(f"🚫 Prédiction refusée pour {suit_name(predicted_suit)}: {reason}")
+            return False
+
+        logger.info(f"Décalage détecté entre {suit_name(s1)} ({v1}) et {suit_name(s2)} ({v2}): {diff}. Plus faible: {suit_name(predicted_suit)}")
+
+        if self.last_source_game_number > 0:
+            target_game = self.last_source_game_number + strategy.user_a
+
+            # Mettre en file d'attente et incrémenter le compteur
+            if self.queue_prediction(target_game, predicted_suit, self.last_source_game_number):
+                self.increment_suit_counter(predicted_suit)
+
+        return True  # Une seule prédiction par message de stats
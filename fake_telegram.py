@@ -0,0 +1,190 @@
+"""
+Client Telegram local pour les simulations et la charge (sans réseau).
+
+Implémente la surface de TelegramClient utilisée par main.py : send_message,
+edit_message, get_entity, add_event_handler, is_connected, connect, disconnect,
+disconnected, catch_up, run_until_disconnected et l'appel de requêtes brutes.
+Les messages NewMessage / MessageEdited sont distribués aux gestionnaires enregistrés, avec une latence configurable et
+l'injection d'erreurs FloodWait.
+"""
+import random
+import asyncio
+import logging
+from itertools import count
+
+logger = logging.getLogger(__name__)
+
+class FakeFloodWaitError(Exception):
+    """Équivalent local de telethon.errors.FloodWaitError."""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"A wait of {seconds} seconds is required")
+        self.seconds = seconds
+
+class FakeEntity:
+    def __init__(self, chat_id: int, title: str = None, broadcast: bool = True):
+        self.id = chat_id
+        self.title = title or f"Canal {chat_id}"
+        self.broadcast = broadcast
+
+class FakeMessage:
+    """Message envoyé ou reçu ; .message contient le texte comme dans Telethon."""
+
+    def __init__(self, client, chat_id: int, message_id: int, text: str, sender_id: int = 0):
+        self._client = client
+        self.chat_id = chat_id
+        self.id = message_id
+        self.message = text
+        self.sender_id = sender_id
+
+    async def delete(self):
+        self._client.channels.get(self.chat_id, {}).pop(self.id, None)
+
+class FakeEvent:
+    """Événement NewMessage / MessageEdited tel que lu par les gestionnaires."""
+
+    def __init__(self, client, chat: FakeEntity, message: FakeMessage, pattern_match=None):
+        self.client = client
+        self.chat = chat
+        self.message = message
+        self.sender_id = message.sender_id
+        self.pattern_match = pattern_match
+        self.is_channel = chat.broadcast
+        self.is_group = False
+        self.is_private = not chat.broadcast
+
+    async def get_chat(self):
+        return self.chat
+
+    async def get_sender(self):
+        return None
+
+    async def respond(self, text: str, file=None):
+        if file is not None:
+            self.client.files.append((self.chat.id, getattr(file, 'name', None), file))
+        return await self.client.send_message(self.chat.id, text)
+
+class FakeTelegramClient:
+    """
+    Client Telegram en mémoire.
+
+    latency / jitter : délai simulé de chaque appel réseau (secondes)
+    flood_rate : probabilité qu'un envoi ou une édition lève FakeFloodWaitError
+    flood_seconds : durée demandée par ces FloodWait
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, flood_rate: float = 0.0,
+                 flood_seconds: float = 1.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.flood_rate = flood_rate
+        self.flood_seconds = flood_seconds
+        self._rng = random.Random(seed)
+        self._ids = count(1)
+        self._handlers = []
+        self._connected = True
+        self._disconnected = asyncio.Event()
+        self._disconnects = 0  # Un disconnect() pendant connect() annule la connexion
+        self.channels = {}     # chat_id -> {message_id: texte}
+        self.entities = {}     # chat_id -> FakeEntity
+        self.files = []        # (chat_id, nom, fichier) joints aux réponses
+        self.calls = {'send_message': 0, 'edit_message': 0, 'get_entity': 0, 'connect': 0, 'request': 0}
+        self.floods = 0
+
+    # --- Surface réseau ---
+
+    async def _network(self, method: str):
+        self.calls[method] += 1
+        delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if method in ('send_message', 'edit_message') and self.flood_rate and self._rng.random() < self.flood_rate:
+            self.floods += 1
+            raise FakeFloodWaitError(self.flood_seconds)
+
+    async def send_message(self, chat_id: int, text: str):
+        await self._network('send_message')
+        message = FakeMessage(self, chat_id, next(self._ids), text)
+        self.channels.setdefault(chat_id, {})[message.id] = text
+        return message
+
+    async def edit_message(self, chat_id: int, message_id: int, text: str):
+        await self._network('edit_message')
+        messages = self.channels.get(chat_id, {})
+        if message_id not in messages:
+            raise RuntimeError(f"Message {message_id} introuvable dans {chat_id}")
+        messages[message_id] = text
+
+    async def get_entity(self, chat_id: int):
+        await self._network('get_entity')
+        return self.entities.setdefault(chat_id, FakeEntity(chat_id))
+
+    async def __call__(self, request):
+        """Requête brute (GetStateRequest...) : aucun effet local."""
+        await self._network('request')
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    @property
+    def disconnected(self):
+        """Se termine à la déconnexion de la connexion courante (comme TelegramClient.disconnected)."""
+        return self._disconnected.wait()
+
+    async def disconnect(self):
+        self._disconnects += 1
+        self._connected = False
+        self._disconnected.set()
+
+    async def connect(self):
+        if not self._connected:
+            disconnects = self._disconnects
+            await self._network('connect')
+            # Comme Telethon, un disconnect() concurrent coupe la connexion en cours d'ouverture
+            if self._disconnects == disconnects:
+                self._connected = True
+                self._disconnected = asyncio.Event()
+
+    async def catch_up(self):
+        pass
+
+    async def run_until_disconnected(self):
+        # Comme Telethon : se termine toujours par disconnect(), même après une déconnexion
+        try:
+            await self._disconnected.wait()
+        finally:
+            await self.disconnect()
+
+    # --- Distribution des événements ---
+
+    def add_event_handler(self, callback, event=None):
+        self._handlers.append((callback, event))
+
+    def _matching_handlers(self, kind: str, text: str):
+        for callback, builder in self._handlers:
+            if type(builder).__name__ != kind:
+                continue
+            pattern = getattr(builder, 'pattern', None)
+            if pattern is None:
+                yield callback, None
+                continue
+            match = pattern(text)
+            if match:
+                yield callback, match
+
+    async def _dispatch(self, kind: str, chat_id: int, message: FakeMessage):
+        chat = self.entities.setdefault(chat_id, FakeEntity(chat_id))
+        for callback, match in self._matching_handlers(kind, message.message):
+            await callback(FakeEvent(self, chat, message, match))
+
+    async def dispatch_new(self, chat_id: int, text: str, sender_id: int = 0) -> FakeMessage:
+        """Simule un nouveau message publié dans un canal."""
+        message = FakeMessage(self, chat_id, next(self._ids), text, sender_id)
+        await self._dispatch('NewMessage', chat_id, message)
+        return message
+
+    async def dispatch_edit(self, chat_id: int, message: FakeMessage, text: str = None):
+        """Simule l'édition d'un message déjà publié."""
+        if text is not None:
+            message.message = text
+        await self._dispatch('MessageEdited', chat_id, message)
@@ -0,0 +1,173 @@
+"""
+Surveillance de l'état du bot pour /health.
+
+Une tâche de fond mesure le retard de planification de la boucle
+d'événements (durée réelle d'un sommeil fixe moins la durée demandée),
+l'âge du dernier message de chaque canal source et l'état de la connexion
+Telegram. /health ne renvoie 503 que si un redémarrage peut aider : boucle
+bloquée ou client déconnecté au-delà du délai de grâce. Un canal source
+silencieux n'est qu'un avertissement (statut « degraded », code 200) : un
+redémarrage ne fait pas parler un canal amont muet.
+
+Si plus aucun message source n'arrive alors que le client semble connecté,
+le moniteur demande d'abord une reconnexion du client dans le processus.
+"""
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+TICK_INTERVAL = 1.0          # Secondes entre deux mesures du retard de la boucle
+LAG_THRESHOLD = 5.0          # Retard de la boucle au-delà duquel le bot est en mauvaise santé
+SOURCE_STALE_AFTER = 1800.0  # Silence d'un canal source au-delà duquel un avertissement est émis
+RECONNECT_AFTER = 600.0      # Silence de tous les canaux sources avant une reconnexion du client
+DISCONNECTED_GRACE = 60.0    # Déconnexion tolérée (reconnexion automatique de Telethon)
+
+class HealthMonitor:
+    """
+    État de santé du bot.
+
+    sources : {chat_id: nom} des canaux sources surveillés
+    is_connected : fonction retournant l'état de la connexion Telegram
+    reconnect : coroutine de reconnexion du client (None pour désactiver)
+    """
+
+    def __init__(self, sources: dict, is_connected=None, reconnect=None,
+                 lag_threshold: float = LAG_THRESHOLD, stale_after: float = SOURCE_STALE_AFTER,
+                 reconnect_after: float = RECONNECT_AFTER):
+        self.sources = sources
+        self.is_connected = is_connected
+        self.reconnect = reconnect
+        self.lag_threshold = lag_threshold
+        self.stale_after = stale_after
+        self.reconnect_after = reconnect_after
+        self.started_at = time.monotonic()
+        self.last_message = {chat_id: None for chat_id in sources}  # chat_id -> instant monotone
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.last_tick = None
+        self.disconnected_since = None
+        self.last_reconnect = None
+        self.reconnects = 0
+        self.reconnecting = None   # Tâche de reconnexion en cours
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name='health-monitor')
+        return self._task
+
+    def mark_message(self, chat_id: int):
+        """Note l'arrivée d'un message (nouveau ou édité) d'un canal source."""
+        if chat_id in self.last_message:
+            self.last_message[chat_id] = time.monotonic()
+
+    def source_age(self, chat_id: int, now: float) -> float:
+        """Secondes depuis le dernier message du canal (depuis le démarrage si aucun)."""
+        last = self.last_message[chat_id]
+        return now - (self.started_at if last is None else last)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(TICK_INTERVAL)
+            now = loop.time()
+            self.lag = max(0.0, now - before - TICK_INTERVAL)
+            self.max_lag = max(self.max_lag, self.lag)
+            self.last_tick = time.monotonic()
+            if self.lag >= self.lag_threshold:
+                logger.warning(f"⚠️ Boucle d'événements en retard de {self.lag:.1f}s")
+            self._check_connection()
+
+    def _check_connection(self):
+        now = time.monotonic()
+        connected = self.is_connected() if self.is_connected else True
+        if connected:
+            self.disconnected_since = None
+        elif self.disconnected_since is None:
+            self.disconnected_since = now
+
+        if self.reconnect is None or self.reconnecting is not None:
+            return
+        silence = min(self.source_age(chat_id, now) for chat_id in self.sources) if self.sources else 0.0
+        since_reconnect = now - (self.started_at if self.last_reconnect is None else self.last_reconnect)
+        if since_reconnect < self.reconnect_after:
+            return
+        if silence >= self.reconnect_after:
+            reason = f"aucun message source depuis {silence:.0f}s"
+        elif self.disconnected_since is not None and now - self.disconnected_since >= DISCONNECTED_GRACE:
+            reason = f"déconnecté depuis {now - self.disconnected_since:.0f}s"
+        else:
+            return
+        self.reconnecting = asyncio.create_task(self._reconnect(reason), name='health-reconnect')
+
+    async def _reconnect(self, reason: str):
+        logger.warning(f"🔄 Reconnexion du client Telegram ({reason})")
+        self.last_reconnect = time.monotonic()
+        self.reconnects += 1
+        try:
+            await self.reconnect()
+            logger.info("✅ Client Telegram reconnecté")
+        except Exception as e:
+            logger.error(f"❌ Échec de la reconnexion: {e}")
+        finally:
+            self.reconnecting = None
+
+    def report(self) -> tuple:
+        """
+        Returns:
+            (bool, dict) - (en bonne santé, détail des mesures, problèmes et avertissements)
+        """
+        now = time.monotonic()
+        problems = []   # Un redémarrage peut aider : 503
+        warnings = []   # À surveiller, sans redémarrage
+
+        if self.lag >= self.lag_threshold:
+            problems.append(f"retard de la boucle {self.lag:.1f}s")
+        if self.last_tick is not None and now - self.last_tick >= self.lag_threshold + TICK_INTERVAL:
+            problems.append(f"moniteur sans mesure depuis {now - self.last_tick:.0f}s")
+
+        sources = {}
+        for chat_id, name in self.sources.items():
+            age = self.source_age(chat_id, now)
+            sources[name] = {'chat_id': chat_id, 'age_s': round(age, 1), 'seen': self.last_message[chat_id] is not None}
+            if age >= self.stale_after:
+                warnings.append(f"{name} silencieux depuis {age:.0f}s")
+
+        connected = self.is_connected() if self.is_connected else True
+        if self.disconnected_since is not None and now - self.disconnected_since >= DISCONNECTED_GRACE:
+            problems.append(f"Telegram déconnecté depuis {now - self.disconnected_since:.0f}s")
+
+        status = 'unhealthy' if problems else ('degraded' if warnings else 'ok')
+        return not problems, {
+            'status': status,
+            'problems': problems,
+            'warnings': warnings,
+            'loop_lag_s': round(self.lag, 3),
+            'loop_max_lag_s': round(self.max_lag, 3),
+            'connected': connected,
+            'reconnecting': self.reconnecting is not None,
+            'reconnects': self.reconnects,
+            'sources': sources,
+            'uptime_s': round(now - self.started_at, 1),
+        }
+
+    def status_lines(self) -> list:
+        healthy, report = self.report()
+        if not healthy:
+            summary = '❌ ' + ', '.join(report['problems'] + report['warnings'])
+        elif report['warnings']:
+            summary = '⚠️ ' + ', '.join(report['warnings'])
+        else:
+            summary = '✅ OK'
+        lines = [
+            f"• {summary}",
+            f"• Retard boucle: {report['loop_lag_s'] * 1000:.0f}ms (max {report['loop_max_lag_s'] * 1000:.0f}ms)",
+            f"• Telegram: {'connecté' if report['connected'] else 'déconnecté'}, {report['reconnects']} reconnexions",
+        ]
+        for name, source in report['sources'].items():
+            seen = f"il y a {source['age_s']:.0f}s" if source['seen'] else "aucun message"
+            lines.append(f"• {name}: {seen}")
+        return lines
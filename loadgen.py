@@ -0,0 +1,227 @@
+"""
+Générateur de charge de bout en bout sur les vrais gestionnaires de main.py.
+
+Le client Telegram est remplacé par FakeTelegramClient : le trafic synthétique
+des canaux 1 et 2 passe par handle_message / handle_edited_message, les acteurs,
+le moteur et les canaux de sortie, exactement comme en production.
+
+Rapport : débit, percentiles de latence (message source -> appliqué par le
+moteur) et exactitude des résultats finaux des prédictions publiées.
+
+Le moteur suit toujours une VirtualClock partant de --start (dans la fenêtre
+H:00-H:29 par défaut) : le rapport ne dépend pas de l'heure de lancement.
+Sans --game-interval elle reste figée ; avec, elle avance de cet intervalle
+à chaque jeu et le reset quotidien la suit : plusieurs jours de jeu
+(fenêtres horaires, blocages, resets à 00h59) sont simulés en quelques
+secondes. Le programme échoue si aucune prédiction n'a pu être vérifiée.
+
+Usage: python loadgen.py --games 2000 --rate 500 --latency 0.01 --flood-rate 0.01
+       python loadgen.py --games 10000 --game-interval 60
+"""
+import os
+import re
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+
+# main.py refuse de démarrer sans identifiants : valeurs factices pour la simulation
+for key, value in (('API_ID', '1'), ('API_HASH', 'simulation'), ('BOT_TOKEN', 'simulation')):
+    os.environ.setdefault(key, value)
+
+import main
+from bench import synthetic_traffic
+from config import SOURCE_CHANNEL_ID, SOURCE_CHANNEL_2_ID
+from delivery import RateLimiter
+from engine import ResultEvent, MAX_RATTRAPAGE, parse_source_message, extract_game_number
+from pipeline import REORDER_MAX_DELAY
+from fake_telegram import FakeTelegramClient
+from clock import VirtualClock
+from suits import parse_suit, mask_has
+
+PREDICTION_PATTERN = re.compile(r"joueur#N:(\d+)\n🔰Couleur de la carte :(\S+)\n.*Résultats : (✅(\d)️⃣|❌|⏳)", re.S)
+
+def percentile(samples: list, p: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+def expected_outcome(masks: dict, target: int, suit: int) -> str:
+    """Résultat attendu d'une prédiction d'après les résultats envoyés."""
+    for rattrapage in range(MAX_RATTRAPAGE + 1):
+        mask = masks.get(target + rattrapage)
+        if mask is None:
+            return '⏳'
+        if mask_has(mask, suit):
+            return f'✅{rattrapage}'
+    return '❌'
+
+def check_outcomes(fake: FakeTelegramClient, chat_id: int, traffic: list) -> dict:
+    """Compare chaque prédiction publiée avec le résultat attendu."""
+    masks = {}
+    for is_stats, text in traffic:
+        event = parse_source_message(text, is_stats)
+        if isinstance(event, ResultEvent) and event.first_mask is not None:
+            masks.setdefault(event.game_number, event.first_mask)
+
+    report = {'predictions': 0, 'correct': 0, 'wrong': 0, 'pending': 0}
+    for text in fake.channels.get(chat_id, {}).values():
+        match = PREDICTION_PATTERN.search(text)
+        if not match:
+            continue
+        report['predictions'] += 1
+        target, suit = int(match.group(1)), parse_suit(match.group(2))
+        actual = '⏳' if match.group(3) == '⏳' else ('❌' if match.group(3) == '❌' else f'✅{match.group(4)}')
+        expected = expected_outcome(masks, target, suit)
+        if actual == '⏳' and expected != '⏳':
+            report['pending'] += 1
+        elif actual == expected:
+            report['correct'] += 1
+        else:
+            report['wrong'] += 1
+    return report
+
+def install_fake_client(args) -> FakeTelegramClient:
+    """Branche le faux client dans main.py comme le ferait start_bot()."""
+    fake = FakeTelegramClient(args.latency, args.jitter, args.flood_rate, args.flood_seconds, args.seed)
+    main.client = fake
+    main.client_pool.clear()
+    main.client_pool.add('principal', fake, args.client_rate, max(1, int(args.client_rate)))
+    for channel in main.output_channels:
+        channel.limiter = RateLimiter(args.output_rate, max(1, int(args.output_rate)))
+    main.setup_message_handlers()
+    main.setup_command_handlers()
+    return fake
+
+async def wait_idle(margin: float, clock: VirtualClock):
+    """Attend que les files d'entrée, les effets et les canaux de sortie soient vides."""
+    while (any(actor.queue.qsize() for actor in main.channel_actors.values())
+           or any(actor.reorder.held for actor in main.channel_actors.values())
+           or main.publisher.queued()):
+        if any(actor.reorder.held for actor in main.channel_actors.values()):
+            # Jeu manquant : le délai de réordonnancement s'écoule en temps virtuel
+            await clock.run_for(REORDER_MAX_DELAY)
+        await asyncio.sleep(0.01)
+    # Laisser le dernier appel réseau de chaque canal se terminer
+    await asyncio.sleep(margin)
+
+async def run_load(args) -> dict:
+    fake = install_fake_client(args)
+
+    # Horodatage de l'application de chaque résultat par le moteur
+    applied_at = {}
+    process = main.engine.process
+
+    def timed_process(event):
+        if isinstance(event, ResultEvent):
+            applied_at.setdefault(event.game_number, time.perf_counter())
+        return process(event)
+
+    main.engine.process = timed_process
+
+    # Temps virtuel : le moteur suit la simulation, figée sans --game-interval
+    clock = VirtualClock(datetime.fromisoformat(args.start))
+    main.use_clock(clock)
+    resets = []
+    if args.game_interval:
+        engine_reset = main.engine.reset
+
+        def counted_reset():
+            resets.append(clock.now())
+            engine_reset()
+
+        main.engine.reset = counted_reset
+        asyncio.create_task(main.schedule_daily_reset())
+        await asyncio.sleep(0)
+
+    main.publisher.start()
+    for actor in main.channel_actors.values():
+        actor.start()
+
+    traffic = list(synthetic_traffic(args.games, args.seed))
+    rng = random.Random(args.seed)
+    dispatched_at = {}
+    interval = 1.0 / args.rate if args.rate else 0.0
+
+    start = time.perf_counter()
+    for i, (is_stats, text) in enumerate(traffic):
+        chat_id = SOURCE_CHANNEL_2_ID if is_stats else SOURCE_CHANNEL_ID
+        if not is_stats:
+            dispatched_at.setdefault(extract_game_number(text), time.perf_counter())
+            if args.game_interval:
+                # Pas à pas : chaque reset se déclenche à son heure, même si le pas dépasse un jour
+                await clock.run_for(args.game_interval)
+        message = await fake.dispatch_new(chat_id, text)
+        if rng.random() < args.edit_ratio:
+            await fake.dispatch_edit(chat_id, message)
+
+        if interval:
+            delay = start + (i + 1) * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif i % 100 == 0:
+            await asyncio.sleep(0)
+    dispatch_elapsed = time.perf_counter() - start
+
+    await wait_idle(args.latency + args.jitter + 0.05, clock)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(applied_at[g] - dispatched_at[g] for g in applied_at if g in dispatched_at)
+    report = {
+        'messages': len(traffic),
+        'dispatch_s': dispatch_elapsed,
+        'total_s': elapsed,
+        'throughput': len(traffic) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+        'floods': fake.floods,
+        'calls': dict(fake.calls),
+    }
+    if args.game_interval:
+        report['virtual_s'] = clock.monotonic()
+        report['resets'] = len(resets)
+    if main.output_channels:
+        report.update(check_outcomes(fake, main.output_channels[0].chat_id, traffic))
+    return report
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Charge de bout en bout avec un faux client Telegram")
+    parser.add_argument('--games', type=int, default=2000, help="Nombre de jeux synthétiques")
+    parser.add_argument('--rate', type=float, default=0.0, help="Messages par seconde (0 = au maximum)")
+    parser.add_argument('--edit-ratio', type=float, default=0.1, help="Part des messages rééditée")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence réseau simulée (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Gigue réseau simulée (s)")
+    parser.add_argument('--flood-rate', type=float, default=0.0, help="Probabilité de FloodWait par appel")
+    parser.add_argument('--flood-seconds', type=float, default=0.5, help="Durée des FloodWait injectés (s)")
+    parser.add_argument('--output-rate', type=float, default=1000.0, help="Débit par canal de sortie (msg/s)")
+    parser.add_argument('--client-rate', type=float, default=1000.0, help="Débit du client (msg/s)")
+    parser.add_argument('--game-interval', type=float, default=0.0,
+                        help="Secondes de temps virtuel par jeu (0 = horloge figée à --start)")
+    parser.add_argument('--start', default='2026-01-01T00:00',
+                        help="Début du temps virtuel (fenêtre de prédiction ouverte par défaut)")
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    report = asyncio.run(run_load(args))
+    print(f"Messages      : {report['messages']} en {report['total_s']:.2f}s (envoi {report['dispatch_s']:.2f}s)")
+    print(f"Débit         : {report['throughput']:.0f} msg/s")
+    print(f"Latence (ms)  : p50 {report['p50_ms']:.2f} / p95 {report['p95_ms']:.2f} / p99 {report['p99_ms']:.2f} / max {report['max_ms']:.2f}")
+    print(f"Appels réseau : {report['calls']} - FloodWait injectés: {report['floods']}")
+    if 'virtual_s' in report:
+        print(f"Temps virtuel : {report['virtual_s'] / 86400:.2f} jours simulés, {report['resets']} resets quotidiens")
+    if 'predictions' in report:
+        print(f"Prédictions   : {report['predictions']} publiées, {report['correct']} correctes, "
+              f"{report['wrong']} fausses, {report['pending']} restées ⏳ alors que le résultat est connu")
+    if not report.get('predictions'):
+        # Un rapport d'exactitude vide ne doit pas passer pour un succès
+        print("❌ Aucune prédiction vérifiée : vérifiez --start (fenêtre H:00-H:29) et les canaux de sortie",
+              file=sys.stderr)
+        sys.exit(1)
@@ -1,17 +1,29 @@
 import os
+import io
 import asyncio
-import re
 import logging
 import sys
 from datetime import datetime, timedelta, timezone, time
 from telethon import TelegramClient, events
 from telethon.sessions import StringSession
+from telethon.tl.functions.updates import GetStateRequest
 from aiohttp import web
 from config import (
     API_ID, API_HASH, BOT_TOKEN, ADMIN_ID,
     SOURCE_CHANNEL_ID, SOURCE_CHANNEL_2_ID, PREDICTION_CHANNEL_ID, PORT,
-    SUIT_MAPPING, ALL_SUITS, SUIT_DISPLAY
+    OUTPUT_CHANNELS, OUTPUT_CHANNEL_RATE, OUTPUT_CHANNEL_BURST,
+    POOL_BOT_TOKENS, POOL_CLIENT_RATE, STRATEGY_FILE, STRATEGY_WATCH_INTERVAL,
+    HEALTH_LAG_THRESHOLD, HEALTH_SOURCE_STALE, HEALTH_RECONNECT_AFTER,
+    RECORD_TRAFFIC, TRAFFIC_DIR
 )
+from engine import PredictionEngine, is_prediction_time_allowed
+from pipeline import ChannelActor
+from delivery import OutputChannel, Publisher, ClientPool
+from suits import suit_name
+from strategy import load_strategy_file
+from health import HealthMonitor
+from recorder import TrafficRecorder
+from diagnostics import MemoryTracker, profile_event_loop, container_sizes, task_counts
 
 # --- Configuration et Initialisation ---
 logging.basicConfig(
@@ -35,28 +47,11 @@ if not BOT_TOKEN:
     exit(1)
 
 logger.info(f"Configuration: SOURCE_CHANNEL={SOURCE_CHANNEL_ID}, SOURCE_CHANNEL_2={SOURCE_CHANNEL_2_ID}, PREDICTION_CHANNEL={PREDICTION_CHANNEL_ID}")
+logger.info(f"Canaux de sortie: {', '.join(f'{name}={chat_id}' for name, chat_id in OUTPUT_CHANNELS) or 'aucun'}")
 
 # --- Variables Globales d'État ---
-# Prédictions actives (déjà envoyées au canal de prédiction)
-pending_predictions = {}
-# Prédictions en attente (prêtes à être envoyées dès que la distance est bonne)
-queued_predictions = {}
-recent_games = {}
-processed_messages = set()
-last_transferred_game = None
-current_game_number = 0
-last_source_game_number = 0
-
-# NOUVELLES VARIABLES POUR LA LOGIQUE DE BLOCAGE (MAX 3 PRÉDICTIONS CONSÉCUTIVES)
-suit_consecutive_counts = {}      # Compteur de prédictions consécutives par costume
-suit_results_history = {}         # Historique des 3 derniers résultats par costume
-suit_block_until = {}             # Timestamp de fin de blocage pour chaque costume (30min)
-last_predicted_suit = None        # Dernier costume prédit (pour détecter les changements)
-suit_first_prediction_time = {}   # Timestamp de la première prédiction consécutive (pour les 30min)
-
-MAX_PENDING_PREDICTIONS = 5  # Augmenté pour gérer les rattrapages
-PROXIMITY_THRESHOLD = 3      # Nombre de jeux avant l'envoi depuis la file d'attente
-USER_A = 1                   # Valeur 'a' choisie par l'utilisateur (entier naturel) - PAR DÉFAUT: 1
+# Moteur de prédiction : tout l'état de la stratégie, sans accès réseau
+engine = PredictionEngine()
 
 source_channel_ok = False
 prediction_channel_ok = False
@@ -65,524 +60,96 @@ transfer_enabled = True # Initialisé à True
 # Client Telegram - sera initialisé dans main()
 client = None
 
-# --- NOUVELLE FONCTION: Contrôle horaire des prédictions ---
-
-def is_prediction_time_allowed():
-    """
-    Vérifie si l'heure actuelle permet l'envoi de prédictions automatiques.
-
-    Règles:
-    - Prédictions autorisées aux heures pile (XX:00) jusqu'à XX:29
-    - Prédictions bloquées de XX:30 à XX:59 (attendre l'heure suivante)
-
-    Returns:
-        tuple: (bool, str) - (autorisé, message explicatif)
-    """
-    now = datetime.now()
-    current_minute = now.minute
-
-    if current_minute >= 30:
-        next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
-        wait_minutes = 60 - current_minute
-        return False, f"🚫 Prédictions bloquées (H:30-H:59). Prochaine fenêtre à {next_hour.strftime('%H:%M')} (dans {wait_minutes}min)"
-
-    return True, f"✅ Prédictions autorisées ({now.strftime('%H:%M')}, jusqu'à H:30)"
-
-# --- Fonctions d'Analyse ---
-
-def extract_game_number(message: str):
-    """Extrait le numéro de jeu du message."""
-    # Pattern plus flexible pour #N59 ou #N 59
-    match = re.search(r"#N\s*(\d+)", message, re.IGNORECASE)
-    if match:
-        return int(match.group(1))
-    return None
-
-def parse_stats_message(message: str):
-    """Extrait les statistiques du canal source 2."""
-    stats = {}
-    # Pattern pour extraire : ♠️ : 9 (23.7 %)
-    patterns = {
-        '♠': r'♠️?\s*:\s*(\d+)',
-        '♥': r'♥️?\s*:\s*(\d+)',
-        '♦': r'♦️?\s*:\s*(\d+)',
-        '♣': r'♣️?\s*:\s*(\d+)'
-    }
-    for suit, pattern in patterns.items():
-        match = re.search(pattern, message)
-        if match:
-            stats[suit] = int(match.group(1))
-    return stats
-
-def extract_parentheses_groups(message: str):
-    """Extrait le contenu entre parenthèses."""
-    return re.findall(r"\(([^)]*)\)", message)
-
-def normalize_suits(group_str: str) -> str:
-    """Remplace les différentes variantes de symboles par un format unique (important pour la détection)."""
-    normalized = group_str.replace('❤️', '♥').replace('❤', '♥').replace('♥️', '♥')
-    normalized = normalized.replace('♠️', '♠').replace('♦️', '♦').replace('♣️', '♣')
-    return normalized
-
-def get_suits_in_group(group_str: str):
-    """Liste toutes les couleurs (suits) présentes dans une chaîne."""
-    normalized = normalize_suits(group_str)
-    return [s for s in ALL_SUITS if s in normalized]
-
-def has_suit_in_group(group_str: str, target_suit: str) -> bool:
-    """Vérifie si la couleur cible est présente dans le groupe de résultat."""
-    normalized = normalize_suits(group_str)
-    target_normalized = normalize_suits(target_suit)
-    for suit in ALL_SUITS:
-        if suit in target_normalized and suit in normalized:
-            return True
-    return False
-
-def get_predicted_suit(missing_suit: str) -> str:
-    """Applique le mapping personnalisé (couleur manquante -> couleur prédite)."""
-    # Ce mapping est maintenant l'inverse : ♠️<->♣️ et ♥️<->♦️
-    # Assurez-vous que SUIT_MAPPING dans config.py contient :
-    # SUIT_MAPPING = {'♠': '♣', '♣': '♠', '♥': '♦', '♦': '♥'}
-    return SUIT_MAPPING.get(missing_suit, missing_suit)
-
-# --- Logique de Prédiction et File d'Attente ---
-
-async def send_prediction_to_channel(target_game: int, predicted_suit: str, base_game: int, rattrapage=0, original_game=None):
-    """Envoie la prédiction au canal de prédiction et l'ajoute aux prédictions actives."""
-    try:
-        # Si c'est un rattrapage, on ne crée pas un nouveau message, on garde la trace
-        if rattrapage > 0:
-            pending_predictions[target_game] = {
-                'message_id': 0, # Pas de message pour le rattrapage lui-même
-                'suit': predicted_suit,
-                'base_game': base_game,
-                'status': '🔮',
-                'rattrapage': rattrapage,
-                'original_game': original_game,
-                'created_at': datetime.now().isoformat()
-            }
-            logger.info(f"Rattrapage {rattrapage} actif pour #{target_game} (Original #{original_game})")
-            return 0
-
-        # NOUVEAU FORMAT DE MESSAGE DE PRÉDICTION
-        prediction_msg = f"""🤖 joueur#N:{target_game}
-🔰Couleur de la carte :{predicted_suit}
-🔰 Rattrapages : 3(🔰+3)
-🧨 Résultats : ⏳"""
-        msg_id = 0
-        message_sent = False
-
-        if PREDICTION_CHANNEL_ID and PREDICTION_CHANNEL_ID != 0:
-            try:
-                # Tenter d'envoyer le message même si prediction_channel_ok est False
-                # car la vérification au démarrage peut avoir échoué temporairement
-                pred_msg = await client.send_message(PREDICTION_CHANNEL_ID, prediction_msg)
-                msg_id = pred_msg.id
-                message_sent = True
-                logger.info(f"✅ Prédiction envoyée au canal {PREDICTION_CHANNEL_ID} (msg_id: {msg_id}, jeu #{target_game}, {predicted_suit})")
-            except Exception as e:
-                logger.error(f"❌ ÉCHEC ENVOI PRÉDICTION AU CANAL {PREDICTION_CHANNEL_ID}: {e}")
-                logger.error(f"   → Type d'erreur: {type(e).__name__}")
-                
-                # Messages d'erreur spécifiques selon le type d'erreur
-                error_str = str(e).lower()
-                if 'chat' in error_str and 'not found' in error_str:
-                    logger.error(f"   → CAUSE: Canal introuvable. Vérifiez l'ID: {PREDICTION_CHANNEL_ID}")
-                elif 'rights' in error_str or 'permission' in error_str or 'forbidden' in error_str:
-                    logger.error(f"   → CAUSE: Droits insuffisants. Le bot doit être ADMIN du canal.")
-                elif 'private' in error_str:
-                    logger.error(f"   → CAUSE: Canal privé inaccessible. Ajoutez le bot au canal.")
-                
-                # On continue quand même pour garder la prédiction en mémoire (mode offline)
-                logger.warning(f"   → La prédiction est conservée en mémoire mais n'a pas été envoyée au canal.")
-        else:
-            logger.warning(f"⚠️ PREDICTION_CHANNEL_ID non configuré ({PREDICTION_CHANNEL_ID}), prédiction non envoyée")
-
-        pending_predictions[target_game] = {
-            'message_id': msg_id,
-            'suit': predicted_suit,
-            'base_game': base_game,
-            'status': '🔮',
-            'check_count': 0,
-            'rattrapage': 0,
-            'created_at': datetime.now().isoformat()
-        }
-
-        if message_sent:
-            logger.info(f"Prédiction active enregistrée: Jeu #{target_game} - {predicted_suit}")
-        else:
-            logger.warning(f"Prédiction enregistrée (mode offline): Jeu #{target_game} - {predicted_suit}")
-            
-        return msg_id
-
-    except Exception as e:
-        logger.error(f"Erreur critique dans send_prediction_to_channel: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return None
-
-def queue_prediction(target_game: int, predicted_suit: str, base_game: int, rattrapage=0, original_game=None):
-    """Met une prédiction en file d'attente pour un envoi différé."""
-    # Vérification d'unicité
-    if target_game in queued_predictions or (target_game in pending_predictions and rattrapage == 0):
-        return False
-
-    queued_predictions[target_game] = {
-        'target_game': target_game,
-        'predicted_suit': predicted_suit,
-        'base_game': base_game,
-        'rattrapage': rattrapage,
-        'original_game': original_game,
-        'queued_at': datetime.now().isoformat()
-    }
-    logger.info(f"📋 Prédiction #{target_game} mise en file d'attente (Rattrapage {rattrapage})")
-    return True
-
-async def check_and_send_queued_predictions(current_game: int):
-    """Vérifie la file d'attente et envoie les prédictions."""
-    global current_game_number
-    current_game_number = current_game
-
-    sorted_queued = sorted(queued_predictions.keys())
-
-    for target_game in sorted_queued:
-        pred_data = queued_predictions.pop(target_game)
-        await send_prediction_to_channel(
-            pred_data['target_game'],
-            pred_data['predicted_suit'],
-            pred_data['base_game'],
-            pred_data.get('rattrapage', 0),
-            pred_data.get('original_game')
-        )
-
-async def update_prediction_status(game_number: int, new_status: str):
-    """Met à jour le message de prédiction dans le canal."""
-    global suit_consecutive_counts, suit_results_history, suit_block_until, last_predicted_suit
-
-    try:
-        if game_number not in pending_predictions:
-            return False
-
-        pred = pending_predictions[game_number]
-        message_id = pred['message_id']
-        suit = pred['suit']
-
-        # Déterminer le texte du résultat selon le statut
-        if '✅' in new_status:
-            result_text = f"{new_status} GAGNÉ"
-        elif '❌' in new_status:
-            result_text = f"{new_status} PERDU"
-        else:
-            result_text = new_status
-
-        # NOUVEAU FORMAT DE MISE À JOUR DU MESSAGE
-        updated_msg = f"""🤖 joueur#N:{game_number}
-🔰Couleur de la carte :{suit}
-🔰 Rattrapages : 3(🔰+3)
-🧨 Résultats : {result_text}"""
-
-        if PREDICTION_CHANNEL_ID and PREDICTION_CHANNEL_ID != 0 and message_id > 0:
-            try:
-                await client.edit_message(PREDICTION_CHANNEL_ID, message_id, updated_msg)
-            except Exception as e:
-                logger.error(f"❌ Erreur mise à jour statut prédiction #{game_number}: {e}")
-                # Ne pas bloquer si la mise à jour échoue, la prédiction reste en mémoire
-
-        # --- NOUVELLE LOGIQUE DE GESTION DES RÉSULTATS ---
-
-        # Initialiser l'historique pour ce costume si nécessaire
-        if suit not in suit_results_history:
-            suit_results_history[suit] = []
-
-        # Ajouter le nouveau résultat à l'historique (garder les 3 derniers)
-        suit_results_history[suit].append(new_status)
-        if len(suit_results_history[suit]) > 3:
-            suit_results_history[suit].pop(0)
-
-        # Vérifier si on a 3 résultats pour ce costume
-        if len(suit_results_history[suit]) == 3:
-            logger.info(f"3 résultats consécutifs pour {suit}: {suit_results_history[suit]}")
-
-            # CAS 1 : Si au moins un ❌ dans les 3 résultats
-            if '❌' in suit_results_history[suit]:
-                logger.info(f"❌ détecté pour {suit} → Lancement immédiat au numéro suivant")
-
-                # Lancer immédiatement une nouvelle prédiction pour le même costume
-                if last_source_game_number > 0:
-                    target_game = last_source_game_number + 1
-                    queue_prediction(target_game, suit, last_source_game_number)
-
-                # Puis bloquer ce costume pendant 5 minutes
-                block_until = datetime.now() + timedelta(minutes=5)
-                suit_block_until[suit] = block_until
-                suit_consecutive_counts[suit] = 0  # Réinitialiser le compteur
-                logger.info(f"{suit} bloqué jusqu'à {block_until}")
-
-            # CAS 2 : Si 3 succès consécutifs (tous ✅)
-            elif all('✅' in result for result in suit_results_history[suit]):
-                logger.info(f"3 succès consécutifs pour {suit} → Blocage 5 minutes")
-                block_until = datetime.now() + timedelta(minutes=5)
-                suit_block_until[suit] = block_until
-                suit_consecutive_counts[suit] = 0  # Réinitialiser le compteur
-                logger.info(f"{suit} bloqué jusqu'à {block_until}")
-
-            # Réinitialiser l'historique après traitement
-            suit_results_history[suit] = []
-
-        # Mettre à jour le statut de la prédiction
-        pred['status'] = new_status
+# --- Diffusion des effets du moteur ---
+
+# Clients sortants : le client principal puis les bots de POOL_BOT_TOKENS
+client_pool = ClientPool()
+
+# Un canal de sortie par destination, chacun avec sa file, son débit et ses message_id
+output_channels = [
+    OutputChannel(name, chat_id, client_pool, OUTPUT_CHANNEL_RATE, OUTPUT_CHANNEL_BURST)
+    for name, chat_id in OUTPUT_CHANNELS
+]
+publisher = Publisher(output_channels)
+
+# Un acteur par canal source : seul lui fait avancer le moteur pour ce canal.
+# Les résultats (canal 1) passent avant les statistiques (canal 2, dernier gagnant).
+results_actor = ChannelActor('source1', False, engine, publisher)
+stats_actor = ChannelActor('source2', True, engine, publisher, defer_to=[results_actor])
+channel_actors = {
+    SOURCE_CHANNEL_ID: results_actor,
+    SOURCE_CHANNEL_2_ID: stats_actor,
+}
+
+def use_clock(clock):
+    """Remplace l'horloge du moteur et des acteurs (simulation), avant le démarrage du trafic."""
+    engine.clock = clock
+    for actor in channel_actors.values():
+        actor.use_clock(clock)
+
+async def reconnect_client():
+    """Reconnecte le client principal sans redémarrer le processus (l'état est conservé)."""
+    await client.disconnect()
+    await client.connect()
+    # Récupérer les mises à jour manquées pendant la coupure
+    await client.catch_up()
+
+# Santé du bot : retard de la boucle, silence des canaux sources, connexion Telegram
+health_monitor = HealthMonitor(
+    {SOURCE_CHANNEL_ID: 'source1', SOURCE_CHANNEL_2_ID: 'source2'},
+    is_connected=lambda: client is not None and client.is_connected(),
+    reconnect=reconnect_client,
+    lag_threshold=HEALTH_LAG_THRESHOLD,
+    stale_after=HEALTH_SOURCE_STALE,
+    reconnect_after=HEALTH_RECONNECT_AFTER,
+)
 
-        # Supprimer si terminé
-        if new_status in ['✅0️⃣', '✅1️⃣', '✅2️⃣', '✅3️⃣', '❌']:
-            del pending_predictions[game_number]
+# Trafic entrant enregistré hors de la boucle d'événements (rejouable avec recorder.read_traffic)
+traffic_recorder = TrafficRecorder(TRAFFIC_DIR)
 
-        return True
-    except Exception as e:
-        logger.error(f"Erreur update_status: {e}")
-        return False
+# Diagnostics à la demande (/profile, /mem, /tasks) ; inactifs par défaut
+memory_tracker = MemoryTracker()
+profiling = False
 
-async def check_prediction_result(game_number: int, first_group: str):
-    """Vérifie les résultats selon la séquence ✅0️⃣, ✅1️⃣, ✅2️⃣, ✅3️⃣ ou ❌."""
-    # 1. Vérification pour le jeu actuel (Cible N)
-    if game_number in pending_predictions:
-        pred = pending_predictions[game_number]
-        if pred.get('rattrapage', 0) == 0:
-            target_suit = pred['suit']
-            # MODIFIÉ : Utilisation du premier groupe
-            if has_suit_in_group(first_group, target_suit):
-                await update_prediction_status(game_number, '✅0️⃣')
-                return
-            else:
-                # Échec N, on lance le rattrapage 1 pour N+1
-                next_target = game_number + 1
-                queue_prediction(next_target, target_suit, pred['base_game'], rattrapage=1, original_game=game_number)
-                logger.info(f"Échec # {game_number}, Rattrapage 1 planifié pour #{next_target}")
-
-    # 2. Vérification pour les rattrapages (N-1, N-2, N-3)
-    # On cherche dans pending_predictions si un jeu original correspond à un rattrapage
-    for target_game, pred in list(pending_predictions.items()):
-        if target_game == game_number and pred.get('rattrapage', 0) > 0:
-            original_game = pred.get('original_game', target_game - pred['rattrapage'])
-            target_suit = pred['suit']
-            rattrapage_actuel = pred['rattrapage']
-
-            # MODIFIÉ : Utilisation du premier groupe
-            if has_suit_in_group(first_group, target_suit):
-                # Trouvé ! On met à jour le statut avec le bon numéro de rattrapage
-                await update_prediction_status(original_game, f'✅{rattrapage_actuel}️⃣')
-                # On supprime aussi l'entrée de rattrapage si elle est différente de l'originale
-                if target_game != original_game:
-                    del pending_predictions[target_game]
-                return
-            else:
-                # Échec du rattrapage actuel
-                if rattrapage_actuel < 3:
-                    # Continuer la séquence
-                    next_rattrapage = rattrapage_actuel + 1
-                    next_target = game_number + 1
-                    queue_prediction(next_target, target_suit, pred['base_game'], rattrapage=next_rattrapage, original_game=original_game)
-                    logger.info(f"Échec rattrapage {rattrapage_actuel} sur #{game_number}, Rattrapage {next_rattrapage} planifié pour #{next_target}")
-                    # Supprimer le rattrapage échoué pour laisser place au suivant
-                    del pending_predictions[target_game]
-                else:
-                    # Échec final après 3 rattrapages
-                    await update_prediction_status(original_game, '❌')
-                    if target_game != original_game:
-                        del pending_predictions[target_game]
-                    logger.info(f"Échec final pour la prédiction originale #{original_game} après 3 rattrapages")
-                return
-
-def can_predict_suit(predicted_suit: str) -> tuple[bool, str]:
+def reload_strategy() -> tuple:
     """
-    Vérifie si un costume peut être prédit selon la règle des 3 consécutives.
-
-    Règles:
-    - Maximum 3 prédictions consécutives du même costume
-    - Après 3 prédictions, le costume est bloqué jusqu'à:
-      1. Un autre costume soit prédit (changement de costume)
-      2. OU après 30 minutes d'attente
+    Recharge STRATEGY_FILE et remplace la stratégie du moteur si elle est valide.
 
     Returns:
-        (bool, str): (peut prédire, raison si bloqué)
+        (bool, str) - (rechargée, message explicatif) ; en cas d'erreur la version actuelle est conservée
     """
-    global suit_consecutive_counts, suit_block_until, last_predicted_suit, suit_first_prediction_time
-
-    now = datetime.now()
-
-    # Si c'est un nouveau costume différent du dernier prédit
-    if last_predicted_suit and last_predicted_suit != predicted_suit:
-        # Réinitialiser le compteur et le blocage du dernier costume
-        if last_predicted_suit in suit_consecutive_counts:
-            logger.info(f"Changement de costume: {last_predicted_suit} -> {predicted_suit}. Réinitialisation des compteurs.")
-            suit_consecutive_counts[last_predicted_suit] = 0
-            if last_predicted_suit in suit_block_until:
-                del suit_block_until[last_predicted_suit]
-            if last_predicted_suit in suit_first_prediction_time:
-                del suit_first_prediction_time[last_predicted_suit]
-        # Réinitialiser aussi le compteur du nouveau costume (car c'est un changement)
-        suit_consecutive_counts[predicted_suit] = 0
-        if predicted_suit in suit_block_until:
-            del suit_block_until[predicted_suit]
-        if predicted_suit in suit_first_prediction_time:
-            del suit_first_prediction_time[predicted_suit]
-        return True, ""
-
-    # Vérifier si le costume est actuellement bloqué
-    if predicted_suit in suit_block_until:
-        block_until = suit_block_until[predicted_suit]
-        if now < block_until:
-            remaining = block_until - now
-            logger.info(f"{predicted_suit} est bloqué. Temps restant: {remaining.seconds//60}min {remaining.seconds%60}s")
-            return False, f"{predicted_suit} bloqué pendant encore {remaining.seconds//60}min"
-        else:
-            # Le blocage de 30min est terminé, on peut prédire
-            logger.info(f"Blocage de 30min terminé pour {predicted_suit}. Prédiction autorisée.")
-            del suit_block_until[predicted_suit]
-            # Réinitialiser le compteur mais garder trace du temps pour les futures vérifications
-            suit_consecutive_counts[predicted_suit] = 1
-            suit_first_prediction_time[predicted_suit] = now
-            return True, ""
-
-    # Vérifier le compteur de prédictions consécutives
-    current_count = suit_consecutive_counts.get(predicted_suit, 0)
-
-    if current_count >= 3:
-        # Le costume a déjà été prédit 3 fois consécutivement
-        # Vérifier si les 30 minutes sont écoulées depuis la première prédiction
-        if predicted_suit in suit_first_prediction_time:
-            first_time = suit_first_prediction_time[predicted_suit]
-            elapsed = now - first_time
-            if elapsed >= timedelta(minutes=30):
-                # 30 minutes écoulées, on peut prédire à nouveau
-                logger.info(f"30 minutes écoulées pour {predicted_suit}. Réinitialisation et prédiction autorisée.")
-                suit_consecutive_counts[predicted_suit] = 1
-                suit_first_prediction_time[predicted_suit] = now
-                return True, ""
-            else:
-                # Pas encore 30 minutes, bloquer
-                remaining = timedelta(minutes=30) - elapsed
-                # Mettre à jour le timestamp de blocage
-                suit_block_until[predicted_suit] = first_time + timedelta(minutes=30)
-                logger.info(f"{predicted_suit} a atteint 3 prédictions. Bloqué encore {remaining.seconds//60}min")
-                return False, f"{predicted_suit} en pause ({remaining.seconds//60}min restantes)"
-        else:
-            # Pas de timestamp enregistré, bloquer par précaution
-            suit_block_until[predicted_suit] = now + timedelta(minutes=30)
-            suit_first_prediction_time[predicted_suit] = now
-            logger.info(f"{predicted_suit} bloqué pour 30min (3 prédictions consécutives)")
-            return False, f"{predicted_suit} bloqué 30min (3 prédictions)"
-
-    # Le costume peut être prédit
-    return True, ""
-
-def increment_suit_counter(predicted_suit: str):
-    """Incrémente le compteur de prédictions consécutives pour un costume."""
-    global suit_consecutive_counts, suit_first_prediction_time, last_predicted_suit
-
-    now = datetime.now()
-
-    # Si c'est la première prédiction de ce costume ou si on revient après un changement
-    if predicted_suit not in suit_consecutive_counts or suit_consecutive_counts.get(predicted_suit, 0) == 0:
-        suit_first_prediction_time[predicted_suit] = now
-        suit_consecutive_counts[predicted_suit] = 1
-    else:
-        suit_consecutive_counts[predicted_suit] += 1
-
-    last_predicted_suit = predicted_suit
-
-    logger.info(f"Compteur {predicted_suit}: {suit_consecutive_counts[predicted_suit]}/3 consécutives")
-
-async def process_stats_message(message_text: str):
-    """Traite les statistiques du canal 2 selon les miroirs ♦️<->♠️ et ❤️<->♣️."""
-    global last_source_game_number, last_predicted_suit, suit_consecutive_counts, suit_block_until
-
-    # --- NOUVELLE VÉRIFICATION HORAIRE ---
-    can_send, time_message = is_prediction_time_allowed()
-    if not can_send:
-        logger.info(f"⏰ {time_message}")
-        return False
-
-    stats = parse_stats_message(message_text)
-    if not stats:
-        return
-
-    # Miroirs : ♦️<->♠️ et ❤️<->♣️
-    pairs = [('♦', '♠'), ('♥', '♣')]
-
-    for s1, s2 in pairs:
-        if s1 in stats and s2 in stats:
-            v1, v2 = stats[s1], stats[s2]
-            diff = abs(v1 - v2)
-
-            # Seuil de décalage miroir modifié à 6
-            if diff >= 6:
-                # Prédire le plus faible parmi les deux miroirs
-                predicted_suit = s1 if v1 < v2 else s2
-
-                # --- NOUVELLE LOGIQUE DE BLOCAGE (MAX 3 CONSÉCUTIVES) ---
-
-                # Vérifier si ce costume peut être prédit
-                can_predict, reason = can_predict_suit(predicted_suit)
-
-                if not can_predict:
-                    logger.info(f"🚫 Prédiction refusée pour {predicted_suit}: {reason}")
-                    return False
-
-                logger.info(f"Décalage détecté entre {s1} ({v1}) et {s2} ({v2}): {diff}. Plus faible: {predicted_suit}")
-
-                if last_source_game_number > 0:
-                    target_game = last_source_game_number + USER_A
-
-                    # Mettre en file d'attente et incrémenter le compteur
-                    if queue_prediction(target_game, predicted_suit, last_source_game_number):
-                        increment_suit_counter(predicted_suit)
-
-                    return # Une seule prédiction par message de stats
-
-def is_message_finalized(message: str) -> bool:
-    """Vérifie si le message est un résultat final (non en cours)."""
-    if '⏰' in message:
-        return False
-    # Accepter les messages qui ont un résultat (par exemple "▶️") ou les symboles de validation
-    return '✅' in message or '🔰' in message or '▶️' in message
-
-async def process_finalized_message(message_text: str, chat_id: int):
-    """Traite les messages du canal source 1 ou 2."""
-    global last_transferred_game, current_game_number, last_source_game_number
     try:
-        if chat_id == SOURCE_CHANNEL_2_ID:
-            await process_stats_message(message_text)
-            return
-
-        if not is_message_finalized(message_text):
-            return
-
-        game_number = extract_game_number(message_text)
-        if game_number is None:
-            return
-
-        current_game_number = game_number
-        last_source_game_number = game_number
-
-        # Hash pour éviter doublons
-        message_hash = f"{game_number}_{message_text[:50]}"
-        if message_hash in processed_messages:
-            return
-        processed_messages.add(message_hash)
-
-        groups = extract_parentheses_groups(message_text)
-        # MODIFIÉ : Vérification qu'il y a au moins 1 groupe et utilisation du premier
-        if len(groups) < 1: 
-            return
-        first_group = groups[0]  # MODIFIÉ : Index 0 au lieu de 1
-
-        # Vérification des résultats
-        await check_prediction_result(game_number, first_group)
-        # Envoi des files d'attente
-        await check_and_send_queued_predictions(game_number)
+        strategy = load_strategy_file(STRATEGY_FILE, engine.strategy)
+    except FileNotFoundError:
+        return False, f"Fichier {STRATEGY_FILE} introuvable, version {engine.strategy.version} conservée"
+    except (OSError, ValueError, TypeError) as e:
+        logger.error(f"❌ Stratégie invalide dans {STRATEGY_FILE}: {e}")
+        return False, f"Stratégie invalide, version {engine.strategy.version} conservée: {e}"
+    engine.set_strategy(strategy)
+    return True, f"Stratégie v{strategy.version} chargée depuis {STRATEGY_FILE}"
+
+async def watch_strategy_file():
+    """Recharge la stratégie dès que STRATEGY_FILE est modifié."""
+    last_mtime = None
+    while True:
+        try:
+            mtime = os.stat(STRATEGY_FILE).st_mtime
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != last_mtime:
+            last_mtime = mtime
+            try:
+                reload_strategy()
+            except Exception as e:
+                # Ne jamais arrêter la surveillance : la version actuelle reste en place
+                logger.error(f"Erreur rechargement de {STRATEGY_FILE}: {e}")
+        await asyncio.sleep(STRATEGY_WATCH_INTERVAL)
 
-    except Exception as e:
-        logger.error(f"Erreur traitement: {e}")
+def process_finalized_message(message_text: str, chat_id: int):
+    """Transmet un message du canal source 1 ou 2 à l'acteur du canal."""
+    actor = channel_actors.get(chat_id)
+    if actor is not None and not actor.submit(message_text):
+        logger.warning(f"⚠️ File {actor.name} pleine, message délesté")
 
 async def handle_message(event):
     """Gère les nouveaux messages dans les canaux sources."""
@@ -601,11 +168,10 @@ async def handle_message(event):
         logger.info(f"DEBUG: Message reçu de chat_id={chat_id}: {event.message.message[:50]}...")
 
         if chat_id == SOURCE_CHANNEL_ID or chat_id == SOURCE_CHANNEL_2_ID:
+            health_monitor.mark_message(chat_id)
             message_text = event.message.message
-            await process_finalized_message(message_text, chat_id)
-            # Après traitement, si c'est le canal 2, on force la vérification de l'envoi
-            if chat_id == SOURCE_CHANNEL_2_ID:
-                await check_and_send_queued_predictions(current_game_number)
+            traffic_recorder.record(chat_id, message_text)
+            process_finalized_message(message_text, chat_id)
 
         # Gérer les commandes admin même si elles ne viennent pas d'un canal
         if sender_id == ADMIN_ID:
@@ -625,11 +191,10 @@ async def handle_edited_message(event):
                 chat_id = int(f"-100{abs(chat_id)}")
 
         if chat_id == SOURCE_CHANNEL_ID or chat_id == SOURCE_CHANNEL_2_ID:
+            health_monitor.mark_message(chat_id)
             message_text = event.message.message
-            await process_finalized_message(message_text, chat_id)
-            # Après traitement, si c'est le canal 2, on force la vérification de l'envoi
-            if chat_id == SOURCE_CHANNEL_2_ID:
-                await check_and_send_queued_predictions(current_game_number)
+            traffic_recorder.record(chat_id, message_text, edited=True)
+            process_finalized_message(message_text, chat_id)
 
     except Exception as e:
         logger.error(f"Erreur handle_edited_message: {e}")
@@ -644,11 +209,10 @@ async def cmd_set_a_shortcut(event):
     if event.is_group or event.is_channel: return
     if event.sender_id != ADMIN_ID and ADMIN_ID != 0: return
 
-    global USER_A
     try:
         val = int(event.pattern_match.group(1))
-        USER_A = val
-        await event.respond(f"✅ Valeur de 'a' mise à jour : {USER_A}")
+        engine.set_strategy(engine.strategy.updated('/a', user_a=val))
+        await event.respond(f"✅ Valeur de 'a' mise à jour : {engine.user_a}")
     except Exception as e:
         await event.respond(f"❌ Erreur: {e}")
 
@@ -656,11 +220,10 @@ async def cmd_set_a(event):
     if event.is_group or event.is_channel: return
     if event.sender_id != ADMIN_ID and ADMIN_ID != 0: return
 
-    global USER_A
     try:
         val = int(event.pattern_match.group(1))
-        USER_A = val
-        await event.respond(f"✅ Valeur de 'a' mise à jour : {USER_A}\nLes prochaines prédictions seront sur le jeu N+{USER_A}")
+        engine.set_strategy(engine.strategy.updated('/set_a', user_a=val))
+        await event.respond(f"✅ Valeur de 'a' mise à jour : {engine.user_a}\nLes prochaines prédictions seront sur le jeu N+{engine.user_a}")
     except Exception as e:
         await event.respond(f"❌ Erreur: {e}")
 
@@ -671,60 +234,180 @@ async def cmd_status(event):
         return
 
     status_msg = f"📊 **État du Bot:**\n\n"
-    status_msg += f"🎮 Jeu actuel (Source 1): #{current_game_number}\n"
-    status_msg += f"🔢 Paramètre 'a': {USER_A}\n"
+    status_msg += f"🎮 Jeu actuel (Source 1): #{engine.current_game_number}\n"
+    status_msg += f"🔢 Paramètre 'a': {engine.user_a}\n"
+    status_msg += f"⚙️ Stratégie: v{engine.strategy.version} ({engine.strategy.source})\n"
     status_msg += f"📢 Canal prédiction accessible: {'✅ Oui' if prediction_channel_ok else '❌ Non'}\n\n"
 
     # Afficher les compteurs de prédictions consécutives
-    if suit_consecutive_counts:
+    counts = engine.suit_consecutive_counts
+    blocks = engine.suit_block_until
+    if any(counts):
         status_msg += f"**📈 Compteurs de prédictions:**\n"
-        for suit, count in suit_consecutive_counts.items():
-            blocked = "🔒" if suit in suit_block_until and datetime.now() < suit_block_until.get(suit, datetime.min) else ""
-            status_msg += f"• {suit}: {count}/3 {blocked}\n"
+        for suit, count in enumerate(counts):
+            if count or blocks[suit] is not None:
+                blocked = "🔒" if blocks[suit] is not None and engine.clock.now() < blocks[suit] else ""
+                status_msg += f"• {suit_name(suit)}: {count}/3 {blocked}\n"
 
     # Afficher les blocages actifs
-    if suit_block_until:
+    if any(block is not None for block in blocks):
         status_msg += f"\n**🔒 Blocages actifs:**\n"
-        for suit, block_time in suit_block_until.items():
-            if datetime.now() < block_time:
-                remaining = block_time - datetime.now()
-                status_msg += f"• {suit}: {remaining.seconds//60}min {remaining.seconds%60}s restantes\n"
+        now = engine.clock.now()
+        for suit, block_time in enumerate(blocks):
+            if block_time is not None and now < block_time:
+                remaining = block_time - now
+                status_msg += f"• {suit_name(suit)}: {remaining.seconds//60}min {remaining.seconds%60}s restantes\n"
 
     # --- NOUVELLE INFO: Statut horaire ---
-    can_predict, time_msg = is_prediction_time_allowed()
+    can_predict, time_msg = is_prediction_time_allowed(engine.strategy, engine.clock)
     status_msg += f"\n**⏰ Fenêtre horaire:**\n"
     status_msg += f"• {time_msg}\n"
 
-    if pending_predictions:
-        status_msg += f"\n**🔮 Actives ({len(pending_predictions)}):**\n"
-        for game_num, pred in sorted(pending_predictions.items()):
-            distance = game_num - current_game_number
+    if engine.pending_predictions:
+        status_msg += f"\n**🔮 Actives ({len(engine.pending_predictions)}):**\n"
+        for game_num, pred in sorted(engine.pending_predictions.items()):
+            distance = game_num - engine.current_game_number
             ratt = f" (R{pred['rattrapage']})" if pred.get('rattrapage', 0) > 0 else ""
-            status_msg += f"• #{game_num}{ratt}: {pred['suit']} - {pred['status']} (dans {distance})\n"
+            status_msg += f"• #{game_num}{ratt}: {suit_name(pred['suit'])} - {pred['status']} (dans {distance})\n"
     else: status_msg += "\n**🔮 Aucune prédiction active**\n"
 
+    status_msg += f"\n**📥 Files d'entrée:**\n"
+    for actor in channel_actors.values():
+        q = actor.queue.stats()
+        status_msg += (f"• {actor.name}: {q['depth']} en attente, {q['received']} reçus, "
+                       f"{q['coalesced']} fusionnés, {q['shed']} délestés, "
+                       f"attente max {q['max_wait']*1000:.0f}ms\n")
+
+    status_msg += f"\n**📤 Canaux de sortie:**\n"
+    for line in publisher.status_lines():
+        status_msg += f"{line}\n"
+
+    status_msg += f"\n**🤖 Pool de clients sortants:**\n"
+    for line in client_pool.status_lines():
+        status_msg += f"{line}\n"
+
+    status_msg += f"\n**🩺 Santé:**\n"
+    for line in health_monitor.status_lines():
+        status_msg += f"{line}\n"
+
     await event.respond(status_msg)
 
+async def cmd_config(event):
+    """Affiche la version actuelle de la stratégie."""
+    if event.is_group or event.is_channel: return
+    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
+        await event.respond("Commande réservée à l'administrateur")
+        return
+
+    lines = "\n".join(engine.strategy.describe())
+    await event.respond(f"⚙️ **Stratégie:**\n\n{lines}\n\nFichier: `{STRATEGY_FILE}` (`/reload` pour recharger)")
+
+async def cmd_reload(event):
+    """Recharge le fichier de stratégie sans redémarrer."""
+    if event.is_group or event.is_channel: return
+    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
+        await event.respond("Commande réservée à l'administrateur")
+        return
+
+    ok, message = reload_strategy()
+    await event.respond(f"{'✅' if ok else '❌'} {message}")
+
+async def send_report(event, caption: str, filename: str, report: str):
+    """Renvoie un rapport de diagnostic en pièce jointe."""
+    attachment = io.BytesIO(report.encode('utf-8'))
+    attachment.name = filename
+    await event.respond(caption, file=attachment)
+
+def global_containers() -> dict:
+    """Principaux conteneurs globaux et leur contenu, pour /mem."""
+    containers = {
+        'engine.pending_predictions': engine.pending_predictions,
+        'engine.queued_predictions': engine.queued_predictions,
+        'engine.processed_messages': engine.processed_messages,
+        'engine.recent_games': engine.recent_games,
+    }
+    for actor in channel_actors.values():
+        containers[f'{actor.name}.queue'] = actor.queue.qsize()
+        containers[f'{actor.name}.reorder.held'] = actor.reorder.held
+    containers['publisher.queued'] = publisher.queued()
+    containers['traffic_recorder.backlog'] = traffic_recorder.backlog()
+    for channel in output_channels:
+        containers[f'{channel.name}.message_ids'] = channel.message_ids
+        containers[f'{channel.name}.queue'] = channel.queue.qsize()
+        containers[f'{channel.name}.latencies'] = channel.latencies
+    return containers
+
+async def cmd_profile(event):
+    """Profil CPU de la boucle d'événements pendant N secondes (10 par défaut)."""
+    global profiling
+    if event.is_group or event.is_channel: return
+    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
+        await event.respond("Commande réservée à l'administrateur")
+        return
+    if profiling:
+        await event.respond("⏳ Un profil est déjà en cours")
+        return
+
+    seconds = int(event.pattern_match.group(1) or 10)
+    profiling = True
+    try:
+        await event.respond(f"⏱️ Profil de la boucle pendant {seconds}s...")
+        report = await profile_event_loop(seconds)
+    finally:
+        profiling = False
+    await send_report(event, f"⏱️ Profil CPU ({seconds}s)", 'profile.txt', report)
+
+async def cmd_mem(event):
+    """Instantané tracemalloc et diff avec le précédent ; `/mem stop` arrête le traçage."""
+    if event.is_group or event.is_channel: return
+    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
+        await event.respond("Commande réservée à l'administrateur")
+        return
+
+    if event.pattern_match.group(1) == 'stop':
+        memory_tracker.stop()
+        await event.respond("✅ tracemalloc arrêté")
+        return
+
+    report = "Conteneurs globaux :\n" + container_sizes(global_containers())
+    report += "\n\n" + memory_tracker.snapshot()
+    await send_report(event, "🧠 Mémoire (`/mem stop` pour arrêter le traçage)", 'memory.txt', report)
+
+async def cmd_tasks(event):
+    """Nombre de tâches de la boucle d'événements."""
+    if event.is_group or event.is_channel: return
+    if event.sender_id != ADMIN_ID and ADMIN_ID != 0:
+        await event.respond("Commande réservée à l'administrateur")
+        return
+
+    await send_report(event, "🧵 Tâches de la boucle", 'tasks.txt', task_counts())
+
 async def cmd_help(event):
     if event.is_group or event.is_channel: return
+    strategy = engine.strategy
     await event.respond(f"""📖 **Aide - Bot de Prédiction V3**
 
 **Règles de prédiction :**
 1. Surveille le **Canal Source 2** (Stats).
-2. Si un décalage d'au moins **6 jeux** existe entre deux cartes :
+2. Si un décalage d'au moins **{strategy.mirror_threshold} jeux** existe entre deux cartes :
    - Prédit la carte en avance.
    - Cible le jeu : **Dernier numéro Source 1 + a**.
 3. **Rattrapages :** Si la carte ne sort pas au jeu cible, le bot retente sur les **3 jeux suivants** (3 rattrapages).
 4. **Blocage (MAX 3) :** Maximum 3 prédictions consécutives du même costume:
-   - Après 3 prédictions du même costume → Bloqué jusqu'à changement de costume OU 30min
+   - Après 3 prédictions du même costume → Bloqué jusqu'à changement de costume OU {strategy.streak_pause_minutes:g}min
    - Si changement de costume détecté → Réinitialise le compteur
-   - Si 30min écoulées → Peut prédire à nouveau
-5. **⏰ Fenêtre horaire :** Prédictions autorisées de H:00 à H:29, bloquées de H:30 à H:59
+   - Si {strategy.streak_pause_minutes:g}min écoulées → Peut prédire à nouveau
+5. **⏰ Fenêtre horaire :** Prédictions autorisées de H:{strategy.window_start_minute:02d} à H:{strategy.window_end_minute - 1:02d}, bloquées le reste de l'heure
 
 **Commandes :**
 - `/status` : Affiche l'état actuel.
 - `/set_a <valeur>` : Modifie l'entier 'a' (par défaut 1).
+- `/config` : Paramètres actuels de la stratégie (admin).
+- `/reload` : Recharge le fichier de stratégie sans redémarrer (admin).
 - `/debug` : Infos techniques.
+- `/profile [secondes]` : Profil CPU de la boucle (admin, fichier joint).
+- `/mem` : Instantané et diff mémoire, `/mem stop` pour arrêter (admin).
+- `/tasks` : Tâches de la boucle d'événements (admin).
 """)
 
 async def cmd_check_channels(event):
@@ -736,26 +419,26 @@ async def cmd_check_channels(event):
 
     check_msg = "🔍 **Vérification des canaux:**\n\n"
     
-    # Vérifier canal de prédiction
-    if PREDICTION_CHANNEL_ID:
+    # Vérifier chaque canal de sortie
+    for channel in output_channels:
         try:
-            entity = await client.get_entity(PREDICTION_CHANNEL_ID)
-            check_msg += f"📢 **Canal de prédiction:**\n"
-            check_msg += f"  • ID: {PREDICTION_CHANNEL_ID}\n"
+            entity = await client.get_entity(channel.chat_id)
+            check_msg += f"📢 **Canal de prédiction ({channel.name}):**\n"
+            check_msg += f"  • ID: {channel.chat_id}\n"
             check_msg += f"  • Titre: {entity.title if hasattr(entity, 'title') else 'N/A'}\n"
             
             # Tenter d'envoyer un message test
             try:
-                test_msg = await client.send_message(PREDICTION_CHANNEL_ID, "🧪 Test de vérification des canaux")
+                test_msg = await client.send_message(channel.chat_id, "🧪 Test de vérification des canaux")
                 await test_msg.delete()
                 check_msg += f"  • Envoi: ✅ OK (message test envoyé et supprimé)\n"
             except Exception as e:
                 check_msg += f"  • Envoi: ❌ ERREUR - {e}\n"
                 check_msg += f"  • 💡 Ajoutez le bot comme **administrateur** du canal avec permission 'Publier des messages'\n"
         except Exception as e:
-            check_msg += f"📢 **Canal de prédiction:** ❌ inaccessible\n"
+            check_msg += f"📢 **Canal de prédiction ({channel.name}):** ❌ inaccessible\n"
             check_msg += f"  • Erreur: {e}\n"
-    else:
+    if not output_channels:
         check_msg += f"📢 **Canal de prédiction:** ⚠️ Non configuré\n"
     
     await event.respond(check_msg)
@@ -768,6 +451,11 @@ def setup_command_handlers():
     client.add_event_handler(cmd_status, events.NewMessage(pattern='/status'))
     client.add_event_handler(cmd_help, events.NewMessage(pattern='/help'))
     client.add_event_handler(cmd_check_channels, events.NewMessage(pattern='/checkchannels'))
+    client.add_event_handler(cmd_config, events.NewMessage(pattern='/config'))
+    client.add_event_handler(cmd_reload, events.NewMessage(pattern='/reload'))
+    client.add_event_handler(cmd_profile, events.NewMessage(pattern=r'^/profile(?: (\d+))?$'))
+    client.add_event_handler(cmd_mem, events.NewMessage(pattern=r'^/mem(?: (stop))?$'))
+    client.add_event_handler(cmd_tasks, events.NewMessage(pattern='/tasks'))
 
 def setup_message_handlers():
     """Configure les gestionnaires de messages des canaux."""
@@ -777,11 +465,13 @@ def setup_message_handlers():
 # --- Serveur Web et Démarrage ---
 
 async def index(request):
-    html = f"""<!DOCTYPE html><html><head><title>Bot Prédiction Baccarat</title></head><body><h1>🎯 Bot de Prédiction Baccarat</h1><p>Le bot est en ligne et surveille les canaux.</p><p><strong>Jeu actuel:</strong> #{current_game_number}</p><p><strong>Canal prédiction:</strong> {'✅ OK' if prediction_channel_ok else '❌ Problème'}</p></body></html>"""
+    html = f"""<!DOCTYPE html><html><head><title>Bot Prédiction Baccarat</title></head><body><h1>🎯 Bot de Prédiction Baccarat</h1><p>Le bot est en ligne et surveille les canaux.</p><p><strong>Jeu actuel:</strong> #{engine.current_game_number}</p><p><strong>Canal prédiction:</strong> {'✅ OK' if prediction_channel_ok else '❌ Problème'}</p></body></html>"""
     return web.Response(text=html, content_type='text/html', status=200)
 
 async def health_check(request):
-    return web.Response(text="OK", status=200)
+    """200 si le bot fonctionne (éventuellement avec avertissements), 503 si un redémarrage peut aider."""
+    healthy, report = health_monitor.report()
+    return web.json_response(report, status=200 if healthy else 503)
 
 async def start_web_server():
     """Démarre le serveur web pour la vérification de l'état (health check)."""
@@ -795,14 +485,20 @@ async def start_web_server():
     await site.start() 
 
 async def schedule_daily_reset():
-    """Tâche planifiée pour la réinitialisation quotidienne des stocks de prédiction à 00h59 WAT."""
+    """
+    Tâche planifiée pour la réinitialisation quotidienne des stocks de prédiction à 00h59 WAT.
+
+    Suit l'horloge du moteur : avec une VirtualClock, le reset se déclenche dès
+    que la simulation dépasse 00h59.
+    """
+    clock = engine.clock
     wat_tz = timezone(timedelta(hours=1)) 
     reset_time = time(0, 59, tzinfo=wat_tz)
 
     logger.info(f"Tâche de reset planifiée pour {reset_time} WAT.")
 
     while True:
-        now = datetime.now(wat_tz)
+        now = clock.now(wat_tz)
         target_datetime = datetime.combine(now.date(), reset_time, tzinfo=wat_tz)
         if now >= target_datetime:
             target_datetime += timedelta(days=1)
@@ -810,28 +506,33 @@ async def schedule_daily_reset():
         time_to_wait = (target_datetime - now).total_seconds()
 
         logger.info(f"Prochain reset dans {timedelta(seconds=time_to_wait)}")
-        await asyncio.sleep(time_to_wait)
+        await clock.sleep(time_to_wait)
 
         logger.warning("🚨 RESET QUOTIDIEN À 00h59 WAT DÉCLENCHÉ!")
 
-        global pending_predictions, queued_predictions, recent_games, processed_messages, last_transferred_game, current_game_number, last_source_game_number
-        global suit_consecutive_counts, suit_results_history, suit_block_until, last_predicted_suit, suit_first_prediction_time
-
-        pending_predictions.clear()
-        queued_predictions.clear()
-        recent_games.clear()
-        processed_messages.clear()
-        suit_consecutive_counts.clear()
-        suit_results_history.clear()
-        suit_block_until.clear()
-        suit_first_prediction_time.clear()
-        last_transferred_game = None
-        current_game_number = 0
-        last_source_game_number = 0
-        last_predicted_suit = None
+        engine.reset()
+        for actor in channel_actors.values():
+            actor.reset()
+        publisher.reset()
 
         logger.warning("✅ Toutes les données de prédiction ont été effacées.")
 
+async def start_client_pool():
+    """Ajoute le client principal et les bots supplémentaires au pool sortant."""
+    burst = max(1, int(POOL_CLIENT_RATE))
+    client_pool.add('principal', client, POOL_CLIENT_RATE, burst)
+
+    for index, token in enumerate(POOL_BOT_TOKENS, start=1):
+        pool_client = TelegramClient(StringSession(), API_ID, API_HASH)
+        try:
+            await pool_client.start(bot_token=token)
+            client_pool.add(f"bot{index}", pool_client, POOL_CLIENT_RATE, burst)
+            logger.info(f"✅ Bot du pool #{index} connecté")
+        except Exception as e:
+            logger.error(f"❌ Bot du pool #{index} non démarré: {e}")
+
+    await client_pool.check_membership([channel.chat_id for channel in output_channels])
+
 async def start_bot():
     """Démarre le client Telegram et les vérifications initiales."""
     global source_channel_ok, prediction_channel_ok, client
@@ -876,12 +577,39 @@ async def start_bot():
             prediction_channel_ok = False
             logger.warning("⚠️ PREDICTION_CHANNEL_ID non configuré")
 
+        # Pool de clients sortants (l'ingestion reste sur le client principal)
+        await start_client_pool()
+
         source_channel_ok = True
         return True
     except Exception as e:
         logger.error(f"Erreur démarrage du client Telegram: {e}")
         return False
 
+async def wait_until_disconnected():
+    """
+    Attend une déconnexion définitive du client principal.
+
+    client.run_until_disconnected() n'est pas utilisé : il se termine par un
+    disconnect() qui, pendant une reconnexion du moniteur de santé, couperait
+    la connexion en cours de rétablissement. Ici on attend client.disconnected
+    et une reconnexion réussie relance simplement l'attente.
+    """
+    # Requête de haut niveau : Telegram envoie alors les mises à jour (comme run_until_disconnected)
+    await client(GetStateRequest())
+    while True:
+        try:
+            await client.disconnected
+        except Exception as e:
+            logger.error(f"Connexion Telegram perdue: {e}")
+        # Déconnexion volontaire du moniteur de santé : attendre la fin de la reconnexion
+        reconnecting = health_monitor.reconnecting
+        if reconnecting is not None:
+            await reconnecting
+        if not client.is_connected():
+            return
+        logger.info("Client reconnecté - En attente de messages...")
+
 async def main():
     """Fonction principale pour lancer le serveur web, le bot et la tâche de reset."""
     try:
@@ -894,17 +622,32 @@ async def main():
         # Démarrer le serveur web APRÈS le bot
         await start_web_server()
 
+        if RECORD_TRAFFIC:
+            traffic_recorder.start()
+
+        # Canaux de sortie puis acteurs des canaux sources
+        publisher.start()
+        for actor in channel_actors.values():
+            actor.start()
+
         # Lancement de la tâche de reset en arrière-plan
         asyncio.create_task(schedule_daily_reset())
+        # Stratégie rechargée à chaque modification du fichier
+        asyncio.create_task(watch_strategy_file())
+        health_monitor.start()
 
         logger.info("Bot complètement opérationnel - En attente de messages...")
-        await client.run_until_disconnected()
+        await wait_until_disconnected()
 
     except Exception as e:
         logger.error(f"Erreur dans main: {e}")
         import traceback
         logger.error(traceback.format_exc())
     finally:
+        traffic_recorder.stop()
+        for member in client_pool.members:
+            if member.client is not client and member.client.is_connected():
+                await member.client.disconnect()
         if client and client.is_connected():
             await client.disconnect()
 
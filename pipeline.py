@@ -0,0 +1,289 @@
+"""
+Traitement ordonné des canaux sources.
+
+Chaque canal source est traité par un seul acteur (une tâche asyncio alimentée
+par une file). Les gestionnaires Telethon se contentent de déposer le texte
+dans la file : l'état du moteur n'est donc jamais modifié par deux tâches à la
+fois. Les résultats du canal 1 passent par un petit tampon de réordonnancement
+indexé par numéro de jeu. Les effets produits sont remis au Publisher
+(delivery.py), qui les dépose dans la file FIFO de chaque canal de sortie :
+l'ordre envoi -> éditions d'un même jeu est garanti par ces files.
+"""
+import asyncio
+import logging
+from collections import deque
+from engine import PredictionEngine, ResultEvent, RESTART_GAP, parse_source_message
+from clock import REAL_CLOCK
+
+logger = logging.getLogger(__name__)
+
+REORDER_WINDOW = 8        # Nombre maximum de résultats retenus en attente d'un trou
+REORDER_MAX_DELAY = 2.0   # Secondes maximum d'attente d'un jeu manquant
+
+RESULTS_QUEUE_SIZE = 256  # Capacité de la file des résultats (canal 1)
+
+# Politiques de délestage quand la file est pleine
+SHED_DROP_OLDEST = 'drop_oldest'  # Jeter le plus ancien message en attente
+SHED_DROP_NEWEST = 'drop_newest'  # Refuser le message entrant
+SHED_POLICIES = (SHED_DROP_OLDEST, SHED_DROP_NEWEST)
+
+class IngressQueue:
+    """
+    File d'entrée bornée d'un acteur.
+
+    - coalesce=True : un seul message retenu, le plus récent remplace l'ancien
+      (statistiques du canal 2, seule la dernière compte)
+    - sinon : FIFO bornée à maxsize, délestage selon policy quand elle est pleine
+
+    Les compteurs permettent de suivre les rafales depuis /status ; les temps
+    d'attente sont mesurés avec clock.monotonic().
+    """
+
+    def __init__(self, maxsize: int = RESULTS_QUEUE_SIZE, coalesce: bool = False, policy: str = SHED_DROP_OLDEST,
+                 clock=REAL_CLOCK):
+        if policy not in SHED_POLICIES:
+            raise ValueError(f"Politique de délestage inconnue: {policy}")
+        self.clock = clock
+        self.maxsize = 1 if coalesce else maxsize
+        self.coalesce = coalesce
+        self.policy = policy
+        self._items = deque()
+        self._ready = asyncio.Event()
+        self._empty = asyncio.Event()
+        self._empty.set()
+        # Compteurs
+        self.received = 0
+        self.coalesced = 0
+        self.shed = 0
+        self.max_depth = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def put_nowait(self, item) -> bool:
+        """Ajoute un message ; retourne False s'il a été délesté."""
+        self.received += 1
+        entry = (self.clock.monotonic(), item)
+        if self.coalesce and self._items:
+            # On garde l'heure d'arrivée du plus ancien pour mesurer la latence réelle
+            self._items[0] = (self._items[0][0], item)
+            self.coalesced += 1
+            return True
+        if len(self._items) >= self.maxsize:
+            self.shed += 1
+            if self.policy == SHED_DROP_NEWEST:
+                return False
+            self._items.popleft()
+        self._items.append(entry)
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._ready.set()
+        self._empty.clear()
+        return True
+
+    async def wait_ready(self):
+        """Attend qu'au moins un message soit disponible."""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+
+    async def wait_empty(self):
+        """Attend que la file soit vide."""
+        await self._empty.wait()
+
+    def drain(self) -> list:
+        """Retire et retourne tous les messages disponibles."""
+        now = self.clock.monotonic()
+        items = []
+        while self._items:
+            enqueued_at, item = self._items.popleft()
+            self.last_wait = now - enqueued_at
+            self.max_wait = max(self.max_wait, self.last_wait)
+            items.append(item)
+        self._empty.set()
+        return items
+
+    def stats(self) -> dict:
+        return {
+            'depth': len(self._items),
+            'received': self.received,
+            'coalesced': self.coalesced,
+            'shed': self.shed,
+            'max_depth': self.max_depth,
+            'last_wait': self.last_wait,
+            'max_wait': self.max_wait,
+        }
+
+class ReorderBuffer:
+    """
+    Réordonne les résultats par numéro de jeu.
+
+    Un résultat est libéré dès que tous les jeux précédents l'ont été. Un trou
+    est abandonné si le tampon dépasse REORDER_WINDOW ou si le plus ancien
+    résultat retenu attend depuis plus de REORDER_MAX_DELAY secondes
+    (mesurées avec clock.monotonic() quand now n'est pas fourni).
+    """
+
+    def __init__(self, window: int = REORDER_WINDOW, max_delay: float = REORDER_MAX_DELAY, clock=REAL_CLOCK):
+        self.clock = clock
+        self.window = window
+        self.max_delay = max_delay
+        self.reset()
+
+    def reset(self):
+        self.last_released = None
+        self.held = {}            # numéro de jeu -> liste d'événements
+        self.oldest_held_at = None
+        self.skipped_gaps = 0
+
+    def push(self, event, now: float = None) -> list:
+        """Ajoute un événement et retourne ceux qui peuvent être appliqués, dans l'ordre."""
+        if not isinstance(event, ResultEvent):
+            return [event]
+
+        game = event.game_number
+        if self.last_released is None:
+            self.last_released = game
+            return [event]
+
+        if game < self.last_released - RESTART_GAP:
+            # Nouvelle numérotation (reset quotidien de la source) : on vide le tampon
+            logger.info(f"Numérotation redémarrée (#{self.last_released} -> #{game})")
+            ready = self.flush()
+            self.last_released = game
+            return ready + [event]
+
+        if game <= self.last_released:
+            # Résultat tardif ou édition : appliqué immédiatement
+            return [event]
+
+        if not self.held:
+            self.oldest_held_at = self.clock.monotonic() if now is None else now
+        self.held.setdefault(game, []).append(event)
+
+        ready = self._release_contiguous()
+        if len(self.held) > self.window:
+            ready += self._skip_gap()
+        return ready
+
+    def expired(self, now: float = None) -> bool:
+        """True si le jeu manquant le plus ancien a assez attendu."""
+        if not self.held:
+            return False
+        now = self.clock.monotonic() if now is None else now
+        return now - self.oldest_held_at >= self.max_delay
+
+    def time_left(self, now: float = None):
+        """Secondes avant expiration, None si rien n'est retenu."""
+        if not self.held:
+            return None
+        now = self.clock.monotonic() if now is None else now
+        return max(0.0, self.max_delay - (now - self.oldest_held_at))
+
+    def release_expired(self, now: float = None) -> list:
+        """Abandonne le trou courant si le délai est dépassé."""
+        if not self.expired(now):
+            return []
+        return self._skip_gap()
+
+    def flush(self) -> list:
+        """Libère tout le tampon dans l'ordre des numéros de jeu."""
+        ready = []
+        for game in sorted(self.held):
+            ready.extend(self.held[game])
+            self.last_released = game
+        self.held.clear()
+        self.oldest_held_at = None
+        return ready
+
+    def _release_contiguous(self) -> list:
+        ready = []
+        while self.last_released + 1 in self.held:
+            self.last_released += 1
+            ready.extend(self.held.pop(self.last_released))
+        if not self.held:
+            self.oldest_held_at = None
+        return ready
+
+    def _skip_gap(self) -> list:
+        """Saute le trou courant jusqu'au plus petit jeu retenu."""
+        next_game = min(self.held)
+        logger.info(f"Jeux #{self.last_released + 1} à #{next_game - 1} manquants, poursuite sans eux")
+        self.skipped_gaps += 1
+        self.last_released = next_game - 1
+        ready = self._release_contiguous()
+        if self.held:
+            self.oldest_held_at = self.clock.monotonic()
+        return ready
+
+class ChannelActor:
+    """
+    Acteur unique d'un canal source : file d'entrée, réordonnancement, moteur.
+
+    Le canal des statistiques utilise une file « dernier gagnant » et laisse
+    passer en priorité les acteurs listés dans defer_to (résultats du canal 1).
+    Les délais (réordonnancement, attente en file) suivent l'horloge du moteur.
+    """
+
+    def __init__(self, name: str, is_stats_channel: bool, engine: PredictionEngine, publisher,
+                 queue: IngressQueue = None, defer_to=()):
+        self.name = name
+        self.is_stats_channel = is_stats_channel
+        self.engine = engine
+        self.publisher = publisher  # Reçoit les effets via publisher.submit(effects)
+        self.queue = queue if queue is not None else IngressQueue(coalesce=is_stats_channel)
+        self.defer_to = list(defer_to)
+        self.reorder = ReorderBuffer()
+        self.use_clock(engine.clock)
+        self.processed = 0
+        self._task = None
+
+    def submit(self, message_text: str) -> bool:
+        """Dépose un message brut (appelé par les gestionnaires Telethon)."""
+        return self.queue.put_nowait(message_text)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name=f"actor-{self.name}")
+        return self._task
+
+    def reset(self):
+        self.reorder.reset()
+
+    def use_clock(self, clock):
+        """Change l'horloge des délais (avant le trafic : les instants déjà notés ne sont pas convertis)."""
+        self.clock = clock
+        self.queue.clock = clock
+        self.reorder.clock = clock
+
+    def step(self, messages: list) -> list:
+        """Analyse, réordonne et applique un lot de messages ; retourne les effets."""
+        ready = []
+        for message_text in messages:
+            event = parse_source_message(message_text, self.is_stats_channel)
+            if event is not None:
+                ready.extend(self.reorder.push(event))
+        ready.extend(self.reorder.release_expired())
+        self.processed += len(messages)
+        return self.engine.process_batch(ready) if ready else []
+
+    async def run(self):
+        while True:
+            try:
+                timeout = self.reorder.time_left()
+                try:
+                    await self.clock.wait_for(self.queue.wait_ready(), timeout)
+                    # Les acteurs prioritaires vident leur file d'abord
+                    for actor in self.defer_to:
+                        await actor.queue.wait_empty()
+                    messages = self.queue.drain()
+                except asyncio.TimeoutError:
+                    messages = []
+                effects = self.step(messages)
+                if effects:
+                    self.publisher.submit(effects)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erreur acteur {self.name}: {e}")
@@ -0,0 +1,349 @@
+"""
+Enregistrement du trafic entrant des canaux sources, pour le débogage et le réglage.
+
+Chaque message (nouveau ou édité) vu par handle_message / handle_edited_message
+est ajouté, hors de la boucle d'événements, à des segments JSONL compressés
+(gzip) qui tournent par nombre de messages ou par durée. Un index léger
+(index.jsonl, une ligne par segment fermé) donne pour chaque segment les
+bornes d'horodatage, de séquence et de numéro de jeu : la lecture d'une
+plage ne décompresse que les segments concernés.
+
+read_traffic() restitue une plage de temps ou de jeux dans l'ordre d'arrivée ;
+as_source_records() la convertit en flux (is_stats_channel, texte) utilisable
+par le moteur, bench.py et backtest.py, bien plus vite qu'en temps réel.
+
+Le rejeu en ligne de commande suit les horodatages enregistrés (VirtualClock).
+
+Usage: python recorder.py traffic --games 100-400
+"""
+import os
+import json
+import gzip
+import time
+import queue
+import logging
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from engine import extract_game_number, RESTART_GAP
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_RECORDS = 5000      # Messages par segment avant rotation
+SEGMENT_SECONDS = 3600.0    # Durée maximale d'un segment (secondes)
+MAX_SEGMENTS = 200          # Segments conservés (les plus anciens sont supprimés), 0 = illimité
+INDEX_FILE = 'index.jsonl'
+SEGMENT_PREFIX = 'traffic-'
+SEGMENT_SUFFIX = '.jsonl.gz'
+
+@dataclass(frozen=True)
+class TrafficEvent:
+    """Un message source tel que reçu."""
+    seq: int               # Ordre d'arrivée dans l'enregistrement
+    ts: float              # Horodatage de réception (epoch, secondes)
+    chat_id: int
+    edited: bool
+    game: Optional[int]    # Numéro de jeu extrait du texte, None si absent
+    text: str
+
+def _new_summary(name: str) -> dict:
+    """Entrée d'index d'un segment vide."""
+    return {'segment': name, 'count': 0, 'first_seq': None, 'last_seq': None,
+            'first_ts': None, 'last_ts': None, 'min_game': None, 'max_game': None}
+
+def _extend_summary(summary: dict, event: TrafficEvent):
+    """Met à jour l'entrée d'index avec un message du segment."""
+    if not summary['count']:
+        summary['first_seq'], summary['first_ts'] = event.seq, event.ts
+    summary['count'] += 1
+    summary['last_seq'], summary['last_ts'] = event.seq, event.ts
+    if event.game is not None:
+        summary['min_game'] = event.game if summary['min_game'] is None else min(summary['min_game'], event.game)
+        summary['max_game'] = event.game if summary['max_game'] is None else max(summary['max_game'], event.game)
+
+def _read_segment(path: str):
+    """Événements d'un segment ; tolère un segment tronqué (arrêt brutal pendant l'écriture)."""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue  # Dernière ligne incomplète
+                yield TrafficEvent(data['seq'], data['ts'], data['chat'], data['edited'], data['game'], data['text'])
+    except (EOFError, OSError, zlib.error):
+        return
+
+class TrafficRecorder:
+    """
+    Enregistreur asynchrone : record() ne fait qu'un dépôt dans une file,
+    un thread d'écriture sérialise, compresse et fait tourner les segments.
+    Au démarrage, ce thread indexe les segments orphelins puis reprend la
+    numérotation après la dernière séquence enregistrée.
+    """
+
+    def __init__(self, directory: str, segment_records: int = SEGMENT_RECORDS,
+                 segment_seconds: float = SEGMENT_SECONDS, max_segments: int = MAX_SEGMENTS):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.recorded = 0
+        self.errors = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._seq = 0
+        self._file = None
+        self._summary = None
+        self._segment_opened_at = 0.0
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='traffic-recorder', daemon=True)
+            self._thread.start()
+            logger.info(f"📼 Enregistrement du trafic dans {self.directory}")
+
+    def record(self, chat_id: int, text: str, edited: bool = False):
+        """Ajoute un message à enregistrer (appelé depuis la boucle, coût O(1))."""
+        if self._thread is not None:
+            self._queue.put((time.time(), chat_id, edited, text))
+
+    def backlog(self) -> int:
+        """Messages en attente d'écriture."""
+        return self._queue.qsize()
+
+    def stop(self, timeout: float = 5.0):
+        """Écrit les messages en attente et ferme le segment courant."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    # --- Thread d'écriture ---
+
+    def _run(self):
+        # Reprise d'un enregistrement existant, hors de la boucle d'événements
+        try:
+            self._index_orphan_segments()
+            self._seq = last_recorded_seq(self.directory)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Erreur reprise de l'enregistrement: {e}")
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Vider ce qui est déjà arrivé pour écrire et compresser par lots
+            while item is not None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            stop = batch[-1] is None
+            try:
+                self._write_batch([entry for entry in batch if entry is not None])
+                if stop:
+                    self._close_segment()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Erreur enregistrement du trafic: {e}")
+            if stop:
+                return
+
+    def _write_batch(self, batch: list):
+        for ts, chat_id, edited, text in batch:
+            if self._file is not None and (self._summary['count'] >= self.segment_records
+                                           or ts - self._segment_opened_at >= self.segment_seconds):
+                self._close_segment()
+            if self._file is None:
+                self._open_segment(ts)
+            self._seq += 1
+            event = TrafficEvent(self._seq, ts, chat_id, edited, extract_game_number(text), text)
+            self._file.write(json.dumps({
+                'seq': event.seq, 'ts': event.ts, 'chat': event.chat_id,
+                'edited': event.edited, 'game': event.game, 'text': event.text,
+            }, ensure_ascii=False).encode('utf-8') + b'\n')
+            _extend_summary(self._summary, event)
+            self.recorded += 1
+        if self._file is not None:
+            # Segment lisible jusqu'ici même en cas d'arrêt brutal
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+
+    def _open_segment(self, ts: float):
+        stamp = datetime.fromtimestamp(ts).strftime('%Y%m%d-%H%M%S-%f')
+        name = f"{SEGMENT_PREFIX}{stamp}-{self._seq + 1:09d}{SEGMENT_SUFFIX}"
+        self._file = gzip.open(os.path.join(self.directory, name), 'wb')
+        self._summary = _new_summary(name)
+        self._segment_opened_at = ts
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._append_index(self._summary)
+        self._file = None
+        self._summary = None
+        self._prune()
+
+    def _append_index(self, summary: dict):
+        with open(os.path.join(self.directory, INDEX_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary) + '\n')
+
+    def _prune(self):
+        if not self.max_segments:
+            return
+        segments = list_segments(self.directory)
+        for name in segments[:-self.max_segments]:
+            os.remove(os.path.join(self.directory, name))
+        if len(segments) > self.max_segments:
+            # Réécrire l'index sans les segments supprimés
+            kept = set(segments[-self.max_segments:])
+            entries = [entry for entry in load_index(self.directory).values() if entry['segment'] in kept]
+            path = os.path.join(self.directory, INDEX_FILE)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(path + '.tmp', path)
+
+    def _index_orphan_segments(self):
+        """Indexe les segments laissés ouverts par un arrêt brutal précédent."""
+        index = load_index(self.directory)
+        for name in list_segments(self.directory):
+            if name not in index:
+                summary = _new_summary(name)
+                for event in _read_segment(os.path.join(self.directory, name)):
+                    _extend_summary(summary, event)
+                self._append_index(summary)
+                logger.info(f"Segment {name} indexé après coup ({summary['count']} messages)")
+
+# --- Lecture ---
+
+def list_segments(directory: str) -> list:
+    """Segments du plus ancien au plus récent."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+
+def load_index(directory: str) -> dict:
+    """Index des segments fermés : nom -> résumé."""
+    index = {}
+    try:
+        with open(os.path.join(directory, INDEX_FILE), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                index[entry['segment']] = entry
+    except FileNotFoundError:
+        pass
+    return index
+
+def last_recorded_seq(directory: str) -> int:
+    """Dernier numéro de séquence enregistré dans le dossier (0 si vide)."""
+    return max((entry['last_seq'] for entry in load_index(directory).values() if entry['last_seq'] is not None),
+               default=0)
+
+def _overlaps(low, high, start, end) -> bool:
+    """Vrai si [low, high] peut croiser [start, end] (bornes None = ouvertes)."""
+    if low is None or high is None:
+        return start is None and end is None
+    return (start is None or high >= start) and (end is None or low <= end)
+
+def read_traffic(directory: str, start_ts: float = None, end_ts: float = None,
+                 start_game: int = None, end_game: int = None):
+    """
+    Restitue les messages enregistrés dans l'ordre d'arrivée.
+
+    Bornes incluses, None = pas de limite. Une plage de jeux restitue la
+    tranche continue du trafic entre le premier et le dernier message de
+    résultat de la plage, statistiques intercalées comprises. Les messages
+    d'autres jeux et les statistiques qui les suivent sont écartés, de même
+    que celles qui précèdent le premier jeu d'une nouvelle numérotation. Les
+    segments que l'index place hors de la plage ne sont pas décompressés.
+    """
+    by_game = start_game is not None or end_game is not None
+    index = load_index(directory)
+    between = []   # Messages sans numéro depuis le dernier jeu de la plage
+    started = False  # Vrai si le dernier jeu lu est dans la plage
+    last_game = None
+    for name in list_segments(directory):
+        entry = index.get(name)
+        if entry is not None:
+            if not entry['count']:
+                continue
+            if not _overlaps(entry['first_ts'], entry['last_ts'], start_ts, end_ts):
+                continue
+            if by_game and not _overlaps(entry['min_game'], entry['max_game'], start_game, end_game):
+                # Segment entièrement hors plage : comme un jeu hors plage
+                between.clear()
+                started = False
+                continue
+        for event in _read_segment(os.path.join(directory, name)):
+            if start_ts is not None and event.ts < start_ts:
+                continue
+            if end_ts is not None and event.ts > end_ts:
+                continue
+            if not by_game:
+                yield event
+            elif event.game is None:
+                if started:
+                    between.append(event)
+            else:
+                if last_game is not None and event.game < last_game - RESTART_GAP:
+                    # Numérotation redémarrée : les statistiques de tête du nouveau cycle sont exclues
+                    started = False
+                last_game = event.game
+                in_range = (start_game is None or event.game >= start_game) and (end_game is None or event.game <= end_game)
+                # Les statistiques précédant le premier jeu de la plage (ou suivant un jeu hors plage) ne sont pas incluses
+                if in_range and started:
+                    yield from between
+                between.clear()
+                started = in_range
+                if in_range:
+                    yield event
+
+def as_source_records(events, stats_channel_id: int):
+    """Convertit des TrafficEvent en flux (is_stats_channel, texte) pour le moteur et le backtest."""
+    for event in events:
+        yield event.chat_id == stats_channel_id, event.text
+
+if __name__ == '__main__':
+    import argparse
+    from config import SOURCE_CHANNEL_2_ID
+    from engine import PredictionEngine, parse_source_message, SendPrediction
+    from clock import VirtualClock
+
+    parser = argparse.ArgumentParser(description="Rejoue une plage du trafic enregistré dans le moteur")
+    parser.add_argument('directory')
+    parser.add_argument('--games', help="Plage de jeux, ex. 100-400")
+    parser.add_argument('--since', help="Début, ex. 2026-01-31T10:00")
+    parser.add_argument('--until', help="Fin, ex. 2026-01-31T12:00")
+    args = parser.parse_args()
+
+    start_game = end_game = None
+    if args.games:
+        low, _, high = args.games.partition('-')
+        start_game, end_game = int(low), int(high or low)
+    start_ts = datetime.fromisoformat(args.since).timestamp() if args.since else None
+    end_ts = datetime.fromisoformat(args.until).timestamp() if args.until else None
+
+    logging.disable(logging.CRITICAL)
+    # L'horloge du moteur suit les horodatages enregistrés : fenêtres et blocages identiques au direct
+    clock = VirtualClock(datetime.fromtimestamp(0))
+    engine = PredictionEngine(clock=clock)
+    started = time.perf_counter()
+    messages = sent = 0
+    for recorded in read_traffic(args.directory, start_ts, end_ts, start_game, end_game):
+        messages += 1
+        clock.set(recorded.ts)
+        event = parse_source_message(recorded.text, recorded.chat_id == SOURCE_CHANNEL_2_ID)
+        if event is not None:
+            sent += sum(isinstance(effect, SendPrediction) for effect in engine.process(event))
+    elapsed = time.perf_counter() - started
+    print(f"{messages} messages rejoués en {elapsed:.2f}s ({messages / elapsed if elapsed else 0:.0f} msg/s), {sent} prédictions")
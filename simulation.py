@@ -0,0 +1,189 @@
+"""
+Simulation auto-vérifiée des règles temporelles du moteur.
+
+Chaque scénario pilote un PredictionEngine (et la tâche de reset de main.py)
+sur une VirtualClock et vérifie par des assertions :
+- la fenêtre horaire (prédictions de H:00 à H:29, rien de H:30 à H:59)
+- la pause de 30 minutes après 3 prédictions consécutives du même costume
+- le blocage de 5 minutes après 3 résultats (3 ✅ ou un ❌)
+- le reset quotidien à 00h59 WAT, une fois par jour simulé
+
+Plusieurs jours de jeu s'exécutent en quelques secondes ; le programme se
+termine avec le code 1 au premier écart.
+
+Usage: python simulation.py
+"""
+import os
+import sys
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+# main.py refuse de démarrer sans identifiants : valeurs factices pour la simulation
+for key, value in (('API_ID', '1'), ('API_HASH', 'simulation'), ('BOT_TOKEN', 'simulation')):
+    os.environ.setdefault(key, value)
+
+from clock import VirtualClock
+from engine import PredictionEngine, ResultEvent, StatsEvent, SendPrediction, EditPrediction
+from strategy import StrategyConfig
+from suits import SPADE, HEART, SUIT_BITS, SUIT_COUNT
+
+WAT = timezone(timedelta(hours=1))
+DAY_START = datetime(2026, 1, 1, 12, 0)
+# Fenêtre ouverte toute l'heure : seules les pauses et blocages comptent
+ALWAYS_OPEN = StrategyConfig(window_end_minute=60)
+# Écart de numéro laissé entre deux prédictions pour qu'aucun résultat ne les résolve
+UNRESOLVED_STEP = 10
+
+class Simulation:
+    """Un moteur, son horloge virtuelle et le numéro du dernier jeu source."""
+
+    def __init__(self, strategy: StrategyConfig = None, start: datetime = DAY_START):
+        self.clock = VirtualClock(start)
+        self.engine = PredictionEngine(clock=self.clock) if strategy is None else PredictionEngine(strategy, self.clock)
+        self.game = 0
+
+    def at(self, when: datetime):
+        self.clock.set(when)
+
+    def result(self, mask: int = 0, step: int = 1) -> list:
+        """Résultat du jeu suivant (ou step jeux plus loin) avec ce premier groupe."""
+        self.game += step
+        return self.engine.process(ResultEvent(self.game, f"{self.game}_simulation", mask))
+
+    def stats(self, suit: int) -> list:
+        """Statistiques dont le décalage désigne suit ; retourne les costumes envoyés."""
+        threshold = self.engine.strategy.mirror_threshold
+        for s1, s2 in self.engine.strategy.mirror_pairs:
+            if suit in (s1, s2):
+                mirror = s2 if suit == s1 else s1
+        counts = [threshold] * SUIT_COUNT
+        counts[suit], counts[mirror] = 0, threshold
+        effects = self.engine.process(StatsEvent(tuple(counts)))
+        return [effect.suit for effect in effects if isinstance(effect, SendPrediction)]
+
+    def predict(self, suit: int) -> bool:
+        """Nouveau jeu sans résoudre les prédictions en cours, puis statistiques ; True si envoyée."""
+        self.result(step=UNRESOLVED_STEP)
+        sent = self.stats(suit)
+        assert sent in ([], [suit]), f"envoi inattendu {sent}"
+        return bool(sent)
+
+def check(condition: bool, message: str):
+    if not condition:
+        raise AssertionError(message)
+
+def scenario_window():
+    sim = Simulation()
+    # Costumes alternés : aucun blocage, seule la fenêtre compte
+    for when, suit, expected in (
+        (DAY_START.replace(minute=29, second=59), SPADE, True),
+        (DAY_START.replace(minute=30), HEART, False),
+        (DAY_START.replace(minute=59, second=59), HEART, False),
+        (DAY_START + timedelta(hours=1), HEART, True),
+        (DAY_START + timedelta(hours=1, minutes=30), SPADE, False),
+    ):
+        sim.at(when)
+        check(sim.predict(suit) == expected, f"{when:%H:%M:%S} : prédiction {'attendue' if expected else 'interdite'}")
+    return "fenêtre H:00-H:29 ouverte, H:30-H:59 fermée"
+
+def scenario_streak_pause():
+    sim = Simulation(ALWAYS_OPEN)
+    for minute in range(3):
+        sim.at(DAY_START + timedelta(minutes=minute))
+        check(sim.predict(SPADE), f"prédiction ♠ n°{minute + 1} refusée")
+    sim.at(DAY_START + timedelta(minutes=3))
+    check(not sim.predict(SPADE), "4e prédiction ♠ consécutive acceptée")
+    sim.at(DAY_START + timedelta(minutes=29, seconds=59))
+    check(not sim.predict(SPADE), "♠ accepté avant la fin de la pause de 30 min")
+    sim.at(DAY_START + timedelta(minutes=30))
+    check(sim.predict(SPADE), "♠ refusé après la pause de 30 min")
+    return "pause de 30 min après 3 prédictions consécutives"
+
+def _resolve(sim: Simulation, mask: int) -> list:
+    """Résultat du jeu suivant ; retourne les statuts finaux édités."""
+    return [effect.text.rsplit(':', 1)[1].strip() for effect in sim.result(mask)
+            if isinstance(effect, EditPrediction) and effect.final]
+
+def scenario_result_block():
+    spade = SUIT_BITS[SPADE]
+
+    # 3 ✅ consécutifs pour ♠ : blocage de 5 minutes à partir du 3e résultat
+    sim = Simulation(ALWAYS_OPEN)
+    sim.result()
+    for minute in range(3):
+        sim.at(DAY_START + timedelta(minutes=minute))
+        check(sim.stats(SPADE) == [SPADE], f"prédiction ♠ n°{minute + 1} refusée")
+        check(_resolve(sim, spade) == ['✅0️⃣ GAGNÉ'], "prédiction ♠ non gagnée au jeu cible")
+    blocked_at = sim.clock.now()
+    sim.at(blocked_at + timedelta(minutes=4, seconds=59))
+    check(not sim.predict(SPADE), "♠ accepté pendant le blocage de 5 min (3 ✅)")
+    sim.at(blocked_at + timedelta(minutes=5))
+    check(sim.predict(SPADE), "♠ refusé après le blocage de 5 min (3 ✅)")
+
+    # ✅, ✅ puis ❌ : relance immédiate au jeu suivant, puis blocage de 5 minutes
+    sim = Simulation(ALWAYS_OPEN)
+    sim.result()
+    for minute in range(2):
+        sim.at(DAY_START + timedelta(minutes=minute))
+        sim.stats(SPADE)
+        _resolve(sim, spade)
+    sim.at(DAY_START + timedelta(minutes=2))
+    check(sim.stats(SPADE) == [SPADE], "3e prédiction ♠ refusée")
+    for _ in range(3):
+        check(_resolve(sim, 0) == [], "prédiction terminée avant la fin des rattrapages")
+    effects = sim.result(0)
+    statuses = [effect.text for effect in effects if isinstance(effect, EditPrediction) and effect.final]
+    relaunched = [effect.target_game for effect in effects if isinstance(effect, SendPrediction)]
+    check(len(statuses) == 1 and 'PERDU' in statuses[0], "échec final ❌ non publié")
+    check(relaunched == [sim.game + 1], f"relance ♠ attendue au jeu #{sim.game + 1}, reçu {relaunched}")
+    blocked_at = sim.clock.now()
+    sim.at(blocked_at + timedelta(minutes=4, seconds=59))
+    check(not sim.predict(SPADE), "♠ accepté pendant le blocage de 5 min (❌)")
+    sim.at(blocked_at + timedelta(minutes=5))
+    check(sim.predict(SPADE), "♠ refusé après le blocage de 5 min (❌)")
+    return "blocage de 5 min après 3 ✅ ou un ❌ (avec relance immédiate)"
+
+async def scenario_daily_reset(days: int = 3):
+    import main
+    clock = VirtualClock(datetime(2026, 1, 1, 0, 0, tzinfo=WAT))
+    main.use_clock(clock)
+    resets = []
+    engine_reset = main.engine.reset
+
+    def recorded_reset():
+        resets.append((clock.now(WAT), len(main.engine.pending_predictions)))
+        engine_reset()
+
+    main.engine.reset = recorded_reset
+    task = asyncio.create_task(main.schedule_daily_reset())
+    try:
+        await asyncio.sleep(0)
+        # Une prédiction active doit être effacée au reset suivant
+        main.engine.pending_predictions[1] = {'suit': SPADE}
+        # Un seul pas de plusieurs jours : chaque reset doit se déclencher à son heure
+        await clock.run_for(days * 86400)
+    finally:
+        task.cancel()
+        main.engine.reset = engine_reset
+
+    expected = [datetime(2026, 1, 1 + day, 0, 59, tzinfo=WAT) for day in range(days)]
+    check([when for when, _ in resets] == expected, f"resets à {[str(when) for when, _ in resets]}")
+    check(resets[0][1] == 1 and not main.engine.pending_predictions, "prédictions actives conservées après le reset")
+    return f"reset quotidien à 00h59 WAT, {days} jours en un seul pas"
+
+def run_all() -> bool:
+    ok = True
+    scenarios = [scenario_window, scenario_streak_pause, scenario_result_block,
+                 lambda: asyncio.run(scenario_daily_reset())]
+    for scenario in scenarios:
+        try:
+            print(f"✅ {scenario()}")
+        except AssertionError as e:
+            ok = False
+            print(f"❌ {e}")
+    return ok
+
+if __name__ == '__main__':
+    logging.disable(logging.CRITICAL)
+    sys.exit(0 if run_all() else 1)
@@ -0,0 +1,169 @@
+"""
+Paramètres de la stratégie, modifiables à chaud.
+
+Le moteur lit tous ses paramètres de règle via une seule référence
+(PredictionEngine.strategy) vers un StrategyConfig immuable. Une mise à jour
+construit et valide une nouvelle version complète, puis remplace la référence
+en une seule affectation : un événement est toujours traité avec une seule
+version cohérente, sans redémarrage ni perte d'état.
+
+Fichier de stratégie (JSON, clés facultatives ; les clés absentes gardent
+leur valeur actuelle) :
+
+    {
+        "user_a": 1,
+        "suit_mapping": {"♠": "♣", "♥": "♠", "♦": "♥", "♣": "♦"},
+        "mirror_pairs": [["♠", "♦"], ["♥", "♣"]],
+        "mirror_threshold": 6,
+        "max_pending_predictions": 5,
+        "proximity_threshold": 3,
+        "result_block_minutes": 5,
+        "streak_pause_minutes": 30,
+        "window_start_minute": 0,
+        "window_end_minute": 30
+    }
+
+suit_mapping, max_pending_predictions et proximity_threshold sont validés et
+affichés par /config, mais le moteur ne les applique pas (PredictionEngine
+n'en tient pas compte, comme avant son extraction) : suit_mapping ne sert
+qu'au backtest (evaluate(use_mapping=True)).
+"""
+import os
+import json
+import logging
+from dataclasses import dataclass, replace, fields
+from suits import SUIT_COUNT, NO_SUIT, MAPPING_TABLE, MIRROR_TABLE, parse_suit, suit_name
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING_PREDICTIONS = 5  # Augmenté pour gérer les rattrapages
+PROXIMITY_THRESHOLD = 3      # Nombre de jeux avant l'envoi depuis la file d'attente
+DEFAULT_USER_A = 1           # Valeur 'a' par défaut (entier naturel)
+MIRROR_THRESHOLD = 6         # Décalage minimal entre deux miroirs
+RESULT_BLOCK_MINUTES = 5     # Blocage d'un costume après 3 résultats (❌ ou 3 ✅)
+STREAK_PAUSE_MINUTES = 30    # Pause après 3 prédictions consécutives du même costume
+WINDOW_START_MINUTE = 0      # Prédictions autorisées de H:00...
+WINDOW_END_MINUTE = 30       # ...jusqu'à H:29
+
+@dataclass(frozen=True)
+class StrategyConfig:
+    """Version immuable et validée des paramètres de la stratégie."""
+    user_a: int = DEFAULT_USER_A
+    suit_mapping: tuple = MAPPING_TABLE          # costume manquant -> costume prédit
+    mirror_pairs: tuple = MIRROR_TABLE           # couples testés dans l'ordre
+    mirror_threshold: int = MIRROR_THRESHOLD
+    max_pending_predictions: int = MAX_PENDING_PREDICTIONS
+    proximity_threshold: int = PROXIMITY_THRESHOLD
+    result_block_minutes: float = RESULT_BLOCK_MINUTES
+    streak_pause_minutes: float = STREAK_PAUSE_MINUTES
+    window_start_minute: int = WINDOW_START_MINUTE
+    window_end_minute: int = WINDOW_END_MINUTE
+    version: int = 1
+    source: str = 'défaut'
+
+    def __post_init__(self):
+        validate_strategy(self)
+
+    def updated(self, source: str, **changes) -> 'StrategyConfig':
+        """Nouvelle version validée avec les changements ; ValueError si invalide."""
+        return replace(self, version=self.version + 1, source=source, **changes)
+
+    def describe(self) -> list:
+        """Lignes lisibles pour /config."""
+        mapping = ', '.join(f"{suit_name(s)}→{suit_name(self.suit_mapping[s])}" for s in range(SUIT_COUNT))
+        pairs = ', '.join(f"{suit_name(a)}↔{suit_name(b)}" for a, b in self.mirror_pairs)
+        ignored = " (non appliqué par le moteur)"
+        return [
+            f"• Version: {self.version} ({self.source})",
+            f"• a: {self.user_a}",
+            f"• Mapping: {mapping}{ignored}",
+            f"• Miroirs: {pairs} (décalage ≥ {self.mirror_threshold})",
+            f"• Prédictions actives max: {self.max_pending_predictions}{ignored}",
+            f"• Seuil de proximité: {self.proximity_threshold}{ignored}",
+            f"• Blocage après résultats: {self.result_block_minutes:g}min",
+            f"• Pause après 3 consécutives: {self.streak_pause_minutes:g}min",
+            f"• Fenêtre: H:{self.window_start_minute:02d} à H:{self.window_end_minute - 1:02d}",
+        ]
+
+def _check_int(name: str, value, minimum: int):
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise ValueError(f"{name} doit être un entier ≥ {minimum} (reçu {value!r})")
+
+def _check_minutes(name: str, value):
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"{name} doit être un nombre de minutes ≥ 0 (reçu {value!r})")
+
+def validate_strategy(strategy: StrategyConfig):
+    """Lève ValueError si un paramètre est incohérent."""
+    _check_int('user_a', strategy.user_a, 0)
+    _check_int('mirror_threshold', strategy.mirror_threshold, 1)
+    _check_int('max_pending_predictions', strategy.max_pending_predictions, 1)
+    _check_int('proximity_threshold', strategy.proximity_threshold, 0)
+    _check_minutes('result_block_minutes', strategy.result_block_minutes)
+    _check_minutes('streak_pause_minutes', strategy.streak_pause_minutes)
+    _check_int('window_start_minute', strategy.window_start_minute, 0)
+    _check_int('window_end_minute', strategy.window_end_minute, 1)
+    if not strategy.window_start_minute < strategy.window_end_minute <= 60:
+        raise ValueError("La fenêtre doit vérifier 0 ≤ window_start_minute < window_end_minute ≤ 60")
+
+    if len(strategy.suit_mapping) != SUIT_COUNT or any(s not in range(SUIT_COUNT) for s in strategy.suit_mapping):
+        raise ValueError("suit_mapping doit associer un costume à chacun des 4 costumes")
+
+    if not strategy.mirror_pairs:
+        raise ValueError("mirror_pairs ne peut pas être vide")
+    for pair in strategy.mirror_pairs:
+        if len(pair) != 2 or any(s not in range(SUIT_COUNT) for s in pair) or pair[0] == pair[1]:
+            raise ValueError(f"Couple de miroirs invalide: {pair!r}")
+
+def _check_type(name: str, value, expected: type, label: str):
+    if not isinstance(value, expected):
+        raise ValueError(f"{name} doit être {label} (reçu {value!r})")
+
+def _parse_suit_value(value) -> int:
+    _check_type('Costume', value, str, 'une chaîne')
+    suit = parse_suit(value)
+    if suit == NO_SUIT:
+        raise ValueError(f"Costume inconnu: {value!r}")
+    return suit
+
+def strategy_changes(data: dict) -> dict:
+    """
+    Convertit un dictionnaire JSON (costumes en emoji) en changements de StrategyConfig.
+
+    Lève ValueError pour une clé inconnue, une valeur du mauvais type ou un costume invalide.
+    """
+    known = {f.name for f in fields(StrategyConfig)} - {'version', 'source'}
+    unknown = set(data) - known
+    if unknown:
+        raise ValueError(f"Paramètres inconnus: {', '.join(sorted(unknown))}")
+
+    changes = dict(data)
+    if 'suit_mapping' in changes:
+        _check_type('suit_mapping', changes['suit_mapping'], dict, 'un objet {costume manquant: costume prédit}')
+        mapping = {_parse_suit_value(missing): _parse_suit_value(predicted)
+                   for missing, predicted in changes['suit_mapping'].items()}
+        if len(mapping) != SUIT_COUNT:
+            raise ValueError("suit_mapping doit définir les 4 costumes")
+        changes['suit_mapping'] = tuple(mapping[suit] for suit in range(SUIT_COUNT))
+    if 'mirror_pairs' in changes:
+        _check_type('mirror_pairs', changes['mirror_pairs'], list, 'une liste de couples')
+        for pair in changes['mirror_pairs']:
+            _check_type('mirror_pairs', pair, list, 'une liste de couples [costume, costume]')
+        changes['mirror_pairs'] = tuple(
+            tuple(_parse_suit_value(suit) for suit in pair) for pair in changes['mirror_pairs']
+        )
+    return changes
+
+def load_strategy_file(path: str, base: StrategyConfig) -> StrategyConfig:
+    """
+    Lit un fichier de stratégie et retourne la nouvelle version (base + changements).
+
+    Lève OSError / ValueError (JSON ou paramètres invalides) ; base reste intacte.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("Le fichier de stratégie doit contenir un objet JSON")
+    return base.updated(f"fichier {os.path.basename(path)}", **strategy_changes(data))
+
+DEFAULT_STRATEGY = StrategyConfig()
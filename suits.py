@@ -0,0 +1,64 @@
+"""
+Représentation interne compacte des costumes.
+
+Un costume est un entier 0..3 (ordre de ALL_SUITS : ♠, ♥, ♦, ♣) et un
+ensemble de costumes est un masque de 4 bits. Les variantes emoji
+(♥️, ❤️, ❤, ♠️...) ne sont décodées qu'une seule fois, à l'analyse du message ;
+les chaînes ne sont reconstruites qu'au moment de formater un message.
+"""
+from config import ALL_SUITS, SUIT_MAPPING, MIRROR_PAIRS as CONFIG_MIRROR_PAIRS
+
+SPADE, HEART, DIAMOND, CLUB = range(4)
+SUIT_COUNT = 4
+NO_SUIT = -1
+
+# Rendu texte (frontière de formatage uniquement)
+SUIT_NAMES = tuple(ALL_SUITS)
+
+# Bit de chaque costume dans un masque
+SUIT_BITS = tuple(1 << suit for suit in range(SUIT_COUNT))
+ALL_SUITS_MASK = (1 << SUIT_COUNT) - 1
+
+# Caractère -> bit ; les sélecteurs de variante (U+FE0F) sont simplement ignorés
+_CHAR_BITS = {
+    '♠': SUIT_BITS[SPADE],
+    '♥': SUIT_BITS[HEART],
+    '❤': SUIT_BITS[HEART],
+    '♦': SUIT_BITS[DIAMOND],
+    '♣': SUIT_BITS[CLUB],
+}
+
+def parse_suit_mask(text: str) -> int:
+    """Masque des costumes présents dans une chaîne (toutes variantes emoji)."""
+    mask = 0
+    for char in text:
+        bit = _CHAR_BITS.get(char)
+        if bit:
+            mask |= bit
+            if mask == ALL_SUITS_MASK:
+                break
+    return mask
+
+def parse_suit(text: str) -> int:
+    """Premier costume trouvé dans une chaîne, NO_SUIT si aucun."""
+    for char in text:
+        bit = _CHAR_BITS.get(char)
+        if bit:
+            return bit.bit_length() - 1
+    return NO_SUIT
+
+def mask_has(mask: int, suit: int) -> bool:
+    """Vérifie si le costume est présent dans le masque."""
+    return bool(mask & SUIT_BITS[suit])
+
+def suit_name(suit: int) -> str:
+    """Rendu texte d'un costume."""
+    return SUIT_NAMES[suit]
+
+# Tables précalculées depuis config.py
+# SUIT_MAPPING : couleur manquante -> couleur prédite
+MAPPING_TABLE = tuple(parse_suit(SUIT_MAPPING.get(name, name)) for name in SUIT_NAMES)
+# MIRROR_PAIRS : couples de costumes miroirs (♠️<->♦️ et ❤️<->♣️), dans l'ordre de config.py
+MIRROR_TABLE = tuple(dict.fromkeys(
+    tuple(sorted((parse_suit(a), parse_suit(b)))) for a, b in CONFIG_MIRROR_PAIRS.items()
+))